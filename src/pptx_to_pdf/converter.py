@@ -1,16 +1,35 @@
+import atexit
+import contextlib
+import itertools
 import subprocess
 import shutil
 import os
+import re
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Callable, Dict, Iterator, Optional, List, Tuple, TypeVar
 
 from rich.progress import Progress
 
+# The UNO bridge ships with LibreOffice (python3-uno on Debian/Ubuntu) and is only
+# importable from the system interpreter. Without it we spawn soffice per file.
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
 # --- Configuration ---
 # Try to find the LibreOffice command, prioritizing 'soffice'
 SOFFICE_COMMAND = shutil.which("soffice") or shutil.which("libreoffice")
 # Define supported input formats for conversion
-SUPPORTED_CONVERSION_FORMATS = {
+SUPPORTED_CONVERSION_FORMATS = frozenset({
     ".pptx", # PowerPoint Open XML Presentation
     ".ppt",  # PowerPoint 97-2003 Presentation
     ".odp",  # OpenDocument Presentation
@@ -21,43 +40,684 @@ SUPPORTED_CONVERSION_FORMATS = {
     # ".vsdx", # Visio Drawing (requires libvisio)
     # ".docx", ".doc", ".odt", # Word/Writer documents
     # ".xlsx", ".xls", ".ods", # Excel/Calc spreadsheets
-}
+})
+# Seconds a LibreOffice conversion may run without finishing a file before it is abandoned
+CONVERSION_TIMEOUT = 120
+# Maximum number of files converted by one soffice process (shares its startup cost)
+CONVERSION_BATCH_SIZE = 8
+# Seconds to wait for a LibreOffice listener to start accepting UNO connections
+UNO_STARTUP_TIMEOUT = 30
+# Seconds between checks on a running soffice process (timeout, cancellation, progress)
+POLL_INTERVAL = 0.1
 # --- End Configuration ---
 
+# Leading bytes of the containers presentations are stored in
+_ZIP_MAGIC = b"PK\x03\x04"                         # OOXML (.pptx, .ppsx) and ODF (.odp)
+_CFB_MAGIC = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1" # OLE compound file (.ppt, .pps)
+# Directory entry name (UTF-16LE, NUL-terminated) of the stream every .ppt/.pps holds
+_PPT_STREAM_NAME = "PowerPoint Document\0".encode("utf-16-le")
+# Compound file sector ids from here up are markers (end of chain, free, ...), not sectors
+_CFB_LAST_SECTOR = 0xFFFFFFFA
+# Directory sectors read before giving up (4096 sectors of 512 bytes hold 16384 entries)
+_CFB_MAX_DIRECTORY_SECTORS = 4096
+# Well-known suffixes of files that are never presentations; only files without a
+# suffix or with a suffix not listed here are opened and sniffed
+_UNSNIFFED_SUFFIXES = frozenset({
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".odt", ".ods", ".odg", ".rtf",
+    ".txt", ".md", ".csv", ".json", ".xml", ".html", ".htm",
+    ".zip", ".jar", ".apk", ".epub", ".7z", ".rar", ".gz", ".tar",
+    ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".tif", ".tiff", ".webp",
+    ".mp3", ".wav", ".mp4", ".mov", ".avi", ".mkv",
+    ".py", ".exe", ".dll", ".so", ".iso",
+})
+# Sniffing results keyed by (path, st_mtime_ns, st_size), so unchanged files are read once
+_sniff_cache: Dict[Tuple[str, int, int], bool] = {}
+# Entries kept in _sniff_cache before it is cleared, so long sessions can't grow it without bound
+_SNIFF_CACHE_MAX = 4096
+
+# Options for every soffice launch that skip start-up work a headless conversion
+# never needs: splash screen, document recovery, first-start wizard, crash
+# reporter, the default Start Center document and the profile lock check.
+_SOFFICE_STARTUP_FLAGS = (
+    "--headless",
+    "--norestore",
+    "--nologo",
+    "--nofirststartwizard",
+    "--nocrashreport",
+    "--nodefault",
+    "--nolockcheck",
+)
+
+# Words in soffice's stderr that explain a missing PDF after a clean exit;
+# matched on the raw bytes so stderr is only decoded for the message
+_ERR_RE = re.compile(rb"\b(error|failed|cannot|unable to)\b", re.IGNORECASE)
+
+# Keyword arguments for every soffice Popen. Python's own descriptors are already
+# non-inheritable (PEP 446), so close_fds adds nothing but, before Python 3.13, it
+# forces fork+exec. Without it (and with SOFFICE_COMMAND being an absolute path,
+# no preexec_fn and no new session) CPython spawns soffice via posix_spawn/vfork
+# instead of duplicating our page tables for every conversion.
+_SPAWN_KWARGS = {"close_fds": False}
+
 def find_soffice() -> Optional[str]:
     """Checks if soffice or libreoffice command exists in PATH."""
     return SOFFICE_COMMAND
 
+def _is_presentation_zip(path: str) -> bool:
+    """Checks whether a zip archive is an OOXML or OpenDocument presentation."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist()) # Only the central directory is read
+            if "ppt/presentation.xml" in names:
+                return True
+            if "mimetype" in names:
+                return archive.read("mimetype").startswith(b"application/vnd.oasis.opendocument.presentation")
+    except (zipfile.BadZipFile, OSError):
+        pass
+    return False
+
+def _is_powerpoint_cfb(path: str) -> bool:
+    """
+    Checks whether an OLE compound file holds a "PowerPoint Document" stream.
+
+    Other compound files (Thumbs.db, .msi, .msg, .doc, .xls, ...) share the
+    signature but not the stream. Only the header, the FAT sectors on the
+    directory's chain and the directory itself are read.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(512)
+            sector_size = 1 << struct.unpack_from("<H", header, 30)[0]
+            if sector_size not in (512, 4096): # The only sizes the format allows
+                return False
+            fat_sector_count, directory_sector = struct.unpack_from("<II", header, 44)
+            difat_sector, difat_sector_count = struct.unpack_from("<II", header, 68)
+            fat_sectors = list(struct.unpack_from("<109I", header, 76))
+            ids_per_sector = sector_size // 4
+
+            def read_sector(sector: int) -> bytes:
+                f.seek((sector + 1) * sector_size) # Sector 0 follows the header sector
+                return f.read(sector_size)
+
+            # FAT sectors past the first 109 are listed in a chain of DIFAT sectors
+            for _ in range(difat_sector_count):
+                if difat_sector >= _CFB_LAST_SECTOR:
+                    break
+                ids = struct.unpack(f"<{ids_per_sector}I", read_sector(difat_sector))
+                fat_sectors.extend(ids[:-1])
+                difat_sector = ids[-1]
+            fat_sectors = fat_sectors[:fat_sector_count]
+
+            # Walk the directory's sector chain; the bound guards against FAT loops
+            for _ in range(_CFB_MAX_DIRECTORY_SECTORS):
+                if directory_sector >= _CFB_LAST_SECTOR:
+                    break
+                directory = read_sector(directory_sector)
+                for offset in range(0, len(directory) - 127, 128):
+                    name_size = struct.unpack_from("<H", directory, offset + 64)[0]
+                    if directory[offset + 66] == 2 and directory[offset:offset + name_size] == _PPT_STREAM_NAME:
+                        return True
+                fat = read_sector(fat_sectors[directory_sector // ids_per_sector])
+                directory_sector = struct.unpack_from("<I", fat, directory_sector % ids_per_sector * 4)[0]
+    except (OSError, struct.error, IndexError, ValueError):
+        pass
+    return False
+
+def _sniff_office(path: str) -> bool:
+    """
+    Detects a presentation from its content, regardless of its file name.
+
+    Legacy PowerPoint files are OLE compound files with a PowerPoint stream.
+    Zip files must also contain a presentation, so that other zip-based files
+    (.docx, .xlsx, plain archives) are not offered for conversion.
+    """
+    try:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        cached = _sniff_cache.get(key)
+        if cached is not None:
+            return cached
+        with open(path, "rb") as f:
+            header = f.read(8)
+    except OSError:
+        return False
+    if header == _CFB_MAGIC:
+        result = _is_powerpoint_cfb(path)
+    elif header.startswith(_ZIP_MAGIC):
+        result = _is_presentation_zip(path)
+    else:
+        result = False
+    if len(_sniff_cache) >= _SNIFF_CACHE_MAX:
+        _sniff_cache.clear()
+    _sniff_cache[key] = result
+    return result
+
 def get_convertible_files(input_dir: Path) -> List[Path]:
-    """Finds files matching SUPPORTED_CONVERSION_FORMATS in the input directory."""
+    """
+    Finds convertible presentations in the input directory.
+
+    Files match by a suffix in SUPPORTED_CONVERSION_FORMATS or, failing that, by
+    their content, so extensionless or misnamed presentations are found too.
+    Files with a well-known non-presentation suffix are never opened.
+    """
     convertible_files = []
-    if not input_dir.is_dir():
+    try:
+        # scandir's DirEntry.is_file() answers from the directory listing itself,
+        # so regular files cost no extra stat() call
+        with os.scandir(input_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                # Lowercased once, so "DECK.PPTX" matches like "deck.pptx"
+                suffix = os.path.splitext(entry.name)[1].lower()
+                if (
+                    suffix in SUPPORTED_CONVERSION_FORMATS
+                    or (suffix not in _UNSNIFFED_SUFFIXES and _sniff_office(entry.path))
+                ):
+                    convertible_files.append(Path(entry.path))
+    except (FileNotFoundError, NotADirectoryError):
         return []
-    # Iterate through items, checking if they are files and have a supported suffix
-    for item in input_dir.iterdir():
-        if item.is_file() and item.suffix.lower() in SUPPORTED_CONVERSION_FORMATS:
-            convertible_files.append(item)
     # Sort alphabetically for consistent user experience
     return sorted(convertible_files)
 
+def _uno_properties(**values) -> Tuple:
+    """Builds the tuple of PropertyValue structs expected by UNO API calls."""
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
+
+_ServerT = TypeVar("_ServerT", bound="LibreOfficeServer") # start()/__enter__ return the instance itself
+
+class LibreOfficeServer:
+    """
+    A single headless LibreOffice process driven over the UNO API.
+
+    Starting LibreOffice dominates the cost of converting a presentation, so a
+    batch reuses one listener instead of launching soffice once per file.
+    Use as a context manager, or call start() and stop() explicitly.
+    """
+
+    def __init__(self, port: Optional[int] = None, startup_timeout: float = UNO_STARTUP_TIMEOUT):
+        self._requested_port = port
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.desktop = None
+        self._process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[str] = None
+
+    def start(self: _ServerT) -> _ServerT:
+        """Launches soffice, waits for its UNO socket and resolves the Desktop service."""
+        # A restart after stop() picks a fresh port unless one was requested
+        self.port = self._requested_port
+        if self.port is None:
+            # Let the OS pick a free port so we never talk to someone else's instance
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                self.port = probe.getsockname()[1]
+        self._profile_dir = tempfile.mkdtemp(prefix="lo_server_profile_")
+        self._process = subprocess.Popen(
+            [
+                SOFFICE_COMMAND,
+                f"-env:UserInstallation={Path(self._profile_dir).as_uri()}", # Private profile (before other options)
+                *_SOFFICE_STARTUP_FLAGS,
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ServiceManager",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **_SPAWN_KWARGS,
+        )
+        try:
+            self._wait_until_listening()
+            local_context = uno.getComponentContext()
+            resolver = local_context.ServiceManager.createInstanceWithContext(
+                "com.sun.star.bridge.UnoUrlResolver", local_context
+            )
+            context = resolver.resolve(
+                f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+            )
+            self.desktop = context.ServiceManager.createInstanceWithContext(
+                "com.sun.star.frame.Desktop", context
+            )
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def _wait_until_listening(self) -> None:
+        """Polls the UNO port until soffice accepts connections."""
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"LibreOffice exited with code {self._process.returncode} during startup.")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.5):
+                    return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"LibreOffice did not accept connections within {self.startup_timeout} seconds."
+                    ) from None
+                time.sleep(0.1)
+
+    def convert(self, input_file: Path, output_pdf_path: Path) -> None:
+        """Converts one presentation to PDF. Raises on any LibreOffice error."""
+        document = self.desktop.loadComponentFromURL(
+            _absolute(input_file).as_uri(), "_blank", 0, _uno_properties(Hidden=True)
+        )
+        if document is None:
+            raise RuntimeError("LibreOffice could not load the document.")
+        try:
+            document.storeToURL(
+                _absolute(output_pdf_path).as_uri(), _uno_properties(FilterName="impress_pdf_Export")
+            )
+        finally:
+            document.close(True)
+
+    def alive(self) -> bool:
+        """Checks whether the soffice process is still running, e.g. after a failed conversion."""
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def kill(self) -> None:
+        """Kills soffice at once, e.g. from another thread to abort a hung UNO call."""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def stop(self) -> None:
+        """Shuts down the listener and removes its temporary profile."""
+        if self.desktop is not None:
+            # The bridge is gone when soffice already exited; terminate below anyway
+            with contextlib.suppress(Exception):
+                self.desktop.terminate()
+            self.desktop = None
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    def __enter__(self: _ServerT) -> _ServerT:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+def _absolute(path: Path) -> Path:
+    """Returns path as-is when already absolute, avoiding resolve()'s per-component stat calls."""
+    return path if path.is_absolute() else path.resolve()
+
+# Per-thread state of conversion workers
+_worker_local = threading.local()
+
+def _worker_profile_url() -> str:
+    """
+    Returns a LibreOffice user profile URL unique to the calling worker.
+
+    soffice processes sharing a profile hand their work to the first running
+    instance (or wait on its lock), which would serialize parallel conversions.
+    The throwaway profile is created on a worker's first call, reused for
+    all its later batches and removed at interpreter exit.
+    """
+    profile_url = getattr(_worker_local, "profile_url", None)
+    if profile_url is None:
+        profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        atexit.register(shutil.rmtree, profile_dir, ignore_errors=True)
+        profile_url = _worker_local.profile_url = Path(profile_dir).as_uri()
+    return profile_url
+
+class _ConversionCancelledError(Exception):
+    """Raised inside a worker when the batch was cancelled while soffice was running."""
+
+def _run_soffice(
+    command: List[str],
+    timeout: float = CONVERSION_TIMEOUT,
+    on_poll: Optional[Callable[[float], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    made_progress: Optional[Callable[[], bool]] = None,
+) -> Tuple[int, bytes]:
+    """
+    Runs a soffice command without blocking for the whole conversion.
+
+    The process is checked every POLL_INTERVAL seconds so the timeout fires on
+    time, cancellation takes effect mid-conversion and callers can report the
+    elapsed time. communicate() with a short timeout is used as the poll so that
+    stderr keeps draining and a chatty soffice can't fill the pipe and stall.
+
+    made_progress, if given, is called on every poll; each time it returns True
+    the timeout starts over, so a batch gets timeout seconds per finished file.
+
+    Returns:
+        A tuple of (returncode, stderr) with stderr as undecoded bytes.
+
+    Raises:
+        subprocess.TimeoutExpired: If soffice runs longer than timeout seconds
+            without making progress.
+        _ConversionCancelledError: If cancel_event is set while soffice is running.
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL, # soffice's stdout is never inspected
+        stderr=subprocess.PIPE,
+        **_SPAWN_KWARGS,
+    )
+    start = last_progress = time.monotonic()
+    try:
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=POLL_INTERVAL)
+                return process.returncode, stderr
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if made_progress is not None and made_progress():
+                last_progress = now
+            if now - last_progress > timeout:
+                raise subprocess.TimeoutExpired(command, timeout)
+            if cancel_event is not None and cancel_event.is_set():
+                raise _ConversionCancelledError()
+            if on_poll is not None:
+                on_poll(now - start)
+    finally:
+        # Never leave soffice running behind a timeout, cancellation or Ctrl+C
+        if process.poll() is None:
+            process.kill()
+            process.communicate()
+
+def _convert_batch(
+    batch: List[Path],
+    output_dir: Path,
+    output_dir_abs: str,
+    on_poll: Optional[Callable[[List[Path], float], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> List[Tuple[Path, Optional[Path], Optional[str]]]:
+    """
+    Converts several office documents to PDF with a single soffice invocation.
+
+    soffice accepts many input files per run, so one startup is shared by the
+    whole batch. Runs inside a worker thread of convert_to_pdf; the caller
+    reports the outcome. If a batch stalls or soffice exits with an error, the
+    files without a complete PDF are retried one per soffice run, so one bad
+    file can't fail the others.
+
+    Args:
+        batch: Paths of the files to convert.
+        output_dir: Directory Path to save the converted PDF files.
+        output_dir_abs: output_dir as an absolute path string, resolved once by the caller.
+        on_poll: Optional callback receiving (batch, elapsed_seconds) while
+            soffice is running.
+        cancel_event: Optional event that aborts the conversion when set.
+
+    Returns:
+        One (input_file, output_pdf_path, error_message) tuple per input file,
+        where exactly one of output_pdf_path and error_message is None.
+    """
+    # Construct the command for LibreOffice headless conversion
+    command = [
+        SOFFICE_COMMAND,
+        f"-env:UserInstallation={_worker_profile_url()}", # Isolated profile per worker (before other options)
+        *_SOFFICE_STARTUP_FLAGS, # Run without GUI and skip unneeded start-up work
+        "--convert-to", "pdf",   # Specify PDF as the output format
+        "--outdir", output_dir_abs,    # Specify output directory (use absolute path)
+        *(os.fspath(_absolute(input_file)) for input_file in batch), # Input files (use absolute paths)
+    ]
+    output_pdf_paths = [output_dir / f"{input_file.stem}.pdf" for input_file in batch]
+    written = 0
+
+    def made_progress() -> bool:
+        # Every newly written PDF restarts the timeout, so it applies per file
+        nonlocal written
+        count = sum(1 for output_pdf_path in output_pdf_paths if output_pdf_path.exists())
+        progressed, written = count > written, count
+        return progressed
+
+    try:
+        # A PDF left by an earlier run must not pass for this run's output
+        for output_pdf_path in output_pdf_paths:
+            output_pdf_path.unlink(missing_ok=True)
+        # Execute the LibreOffice command
+        returncode, stderr = _run_soffice(
+            command,
+            timeout=CONVERSION_TIMEOUT,
+            on_poll=(lambda elapsed: on_poll(batch, elapsed)) if on_poll else None,
+            cancel_event=cancel_event,
+            made_progress=made_progress,
+        )
+    except FileNotFoundError:
+        # This specific error means SOFFICE_COMMAND itself wasn't found
+        # Should be caught earlier, but good practice to handle
+        error_msg = f"'{SOFFICE_COMMAND}' command not found during execution."
+        return [(input_file, None, error_msg) for input_file in batch]
+    except subprocess.TimeoutExpired:
+        if len(batch) > 1:
+            return _retry_interrupted_batch(batch, output_pdf_paths, output_dir, output_dir_abs, on_poll, cancel_event)
+        # soffice was killed mid-file, so a PDF that exists may be truncated
+        output_pdf_paths[0].unlink(missing_ok=True)
+        return [(batch[0], None, f"Conversion timed out after {CONVERSION_TIMEOUT} seconds.")]
+    except _ConversionCancelledError:
+        return [(input_file, None, "Conversion cancelled.") for input_file in batch]
+    except Exception as e:
+        # Catch any other unexpected exceptions during subprocess execution
+        error_msg = f"An unexpected error occurred: {type(e).__name__}: {e}"
+        return [(input_file, None, error_msg) for input_file in batch]
+
+    if returncode != 0:
+        if len(batch) > 1:
+            # soffice stopped (e.g. crashed) somewhere in the batch, like a timeout
+            return _retry_interrupted_batch(batch, output_pdf_paths, output_dir, output_dir_abs, on_poll, cancel_event)
+        # A lone file owns the exit code, so a PDF it left behind isn't trusted
+        output_pdf_paths[0].unlink(missing_ok=True)
+
+    # After a clean exit a file's own output PDF decides its outcome; the shared
+    # stderr only explains why a PDF is missing
+    results = []
+    error_msg = None
+    for input_file, output_pdf_path in zip(batch, output_pdf_paths):
+        if output_pdf_path.exists():
+            results.append((input_file, output_pdf_path, None))
+            continue
+        if error_msg is None:
+            error_msg = _batch_error_message(returncode, stderr)
+        results.append((input_file, None, error_msg))
+    return results
+
+def _retry_interrupted_batch(
+    batch: List[Path],
+    output_pdf_paths: List[Path],
+    output_dir: Path,
+    output_dir_abs: str,
+    on_poll: Optional[Callable[[List[Path], float], None]],
+    cancel_event: Optional[threading.Event],
+) -> List[Tuple[Path, Optional[Path], Optional[str]]]:
+    """
+    Keeps the finished PDFs of a timed-out or failed batch and reconverts the rest one by one.
+
+    soffice converts its inputs in order, so every PDF before the last one it
+    wrote is complete. The last one may have been cut off by the kill or crash
+    and is redone along with the files soffice never reached.
+    """
+    written = [i for i, output_pdf_path in enumerate(output_pdf_paths) if output_pdf_path.exists()]
+    complete = set(written[:-1])
+    results = []
+    for i, (input_file, output_pdf_path) in enumerate(zip(batch, output_pdf_paths)):
+        if i in complete:
+            results.append((input_file, output_pdf_path, None))
+        elif cancel_event is not None and cancel_event.is_set():
+            results.append((input_file, None, "Conversion cancelled."))
+        else:
+            results.extend(_convert_batch([input_file], output_dir, output_dir_abs, on_poll, cancel_event))
+    return results
+
+def _batch_error_message(returncode: int, stderr: Optional[bytes]) -> str:
+    """Explains a missing output PDF from soffice's exit code and stderr."""
+    stderr_text = stderr.decode(errors="replace") if stderr else ""
+    if returncode != 0:
+        return f"LibreOffice exited with code {returncode}. Stderr: {stderr_text or 'N/A'}"
+    # A non-zero exit already explains the failure, so stderr is only searched after a clean one
+    if stderr and _ERR_RE.search(stderr):
+        return f"LibreOffice reported an error. Stderr: {stderr_text}"
+    # Sometimes soffice exits 0 but fails silently or creates no output
+    return "Conversion process finished but output PDF was not found."
+
+def _pool_conversions(
+    files_to_convert: List[Path],
+    output_dir: Path,
+    max_workers: Optional[int],
+    batch_size: int,
+    on_poll: Optional[Callable[[List[Path], float], None]] = None,
+) -> Iterator[Tuple[Path, Optional[Path], Optional[str]]]:
+    """Yields per-file results as soffice batches in a thread pool finish."""
+    # Threads are enough here: the work happens in soffice, and subprocess releases the GIL
+    if max_workers is None:
+        max_workers = min(len(files_to_convert), os.cpu_count() or 1)
+    max_workers = max(1, max_workers)
+    # Batch to amortize soffice startup, but never so coarsely that workers sit idle
+    batch_size = max(1, min(batch_size, -(-len(files_to_convert) // max_workers)))
+    batches = [files_to_convert[i:i + batch_size] for i in range(0, len(files_to_convert), batch_size)]
+
+    # Resolved once for all batches rather than once per soffice command
+    output_dir_abs = os.fspath(_absolute(output_dir))
+
+    cancel_event = threading.Event()
+    # Each worker sets up its own LibreOffice profile before taking any batch
+    with ThreadPoolExecutor(max_workers=max_workers, initializer=_worker_profile_url) as executor:
+        futures = [
+            executor.submit(_convert_batch, batch, output_dir, output_dir_abs, on_poll, cancel_event)
+            for batch in batches
+        ]
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            # On early exit (e.g. Ctrl+C) drop queued conversions and kill running ones
+            for future in futures:
+                future.cancel()
+            cancel_event.set()
+
+def _uno_convert_with_deadline(server: LibreOfficeServer, input_file: Path, output_pdf_path: Path) -> None:
+    """
+    Runs server.convert() with CONVERSION_TIMEOUT enforced.
+
+    A UNO call can't be interrupted, so it runs in a helper thread while this
+    one waits. On timeout or Ctrl+C soffice is killed, which also makes the
+    pending call fail.
+
+    Raises:
+        TimeoutError: If the conversion takes longer than CONVERSION_TIMEOUT seconds.
+    """
+    failures: List[Exception] = []
+
+    def work() -> None:
+        try:
+            server.convert(input_file, output_pdf_path)
+        except Exception as e:
+            failures.append(e)
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    deadline = time.monotonic() + CONVERSION_TIMEOUT
+    try:
+        # join() with a timeout stays interruptible by Ctrl+C
+        while worker.is_alive():
+            worker.join(POLL_INTERVAL)
+            if worker.is_alive() and time.monotonic() > deadline:
+                raise TimeoutError(f"Conversion timed out after {CONVERSION_TIMEOUT} seconds.")
+    except BaseException:
+        server.kill()
+        raise
+    if failures:
+        raise failures[0]
+
+def _uno_conversions(
+    server: LibreOfficeServer,
+    files_to_convert: List[Path],
+    output_dir: Path,
+    fallback: Callable[[List[Path]], Iterator[Tuple[Path, Optional[Path], Optional[str]]]],
+) -> Iterator[Tuple[Path, Optional[Path], Optional[str]]]:
+    """
+    Yields conversion results from a running LibreOfficeServer, one file at a time.
+
+    A conversion that times out kills the listener, and one that crashes it
+    leaves it dead; either way it is restarted for the remaining files. If it
+    won't restart, they are handed to fallback.
+    """
+    for index, input_file in enumerate(files_to_convert):
+        output_pdf_path = output_dir / f"{input_file.stem}.pdf"
+        try:
+            # A PDF left by an earlier run must not pass for this run's output
+            output_pdf_path.unlink(missing_ok=True)
+            _uno_convert_with_deadline(server, input_file, output_pdf_path)
+        except Exception as e:
+            # The conversion was cut short, so a PDF that exists may be truncated
+            output_pdf_path.unlink(missing_ok=True)
+            timed_out = isinstance(e, TimeoutError)
+            if timed_out:
+                yield input_file, None, str(e)
+            else:
+                yield input_file, None, f"LibreOffice failed to convert the file: {type(e).__name__}: {e}"
+            # With soffice gone every later call would fail at once on the dead bridge
+            if timed_out or not server.alive():
+                server.stop()
+                try:
+                    server.start()
+                except Exception:
+                    remaining = files_to_convert[index + 1:]
+                    if remaining:
+                        yield from fallback(remaining)
+                    return
+            continue
+        if not output_pdf_path.exists():
+            yield input_file, None, "Conversion process finished but output PDF was not found."
+        else:
+            yield input_file, output_pdf_path, None
+
 def convert_to_pdf(
     files_to_convert: List[Path],
     output_dir: Path,
     progress: Progress,
+    max_workers: Optional[int] = None,
+    on_success: Optional[Callable[[Path], None]] = None,
+    batch_size: int = CONVERSION_BATCH_SIZE,
 ) -> Tuple[List[Path], List[Tuple[Path, str]]]:
     """
     Converts a list of office documents to PDF using LibreOffice.
 
+    When the LibreOffice UNO bridge is importable, all files are converted by a
+    single LibreOfficeServer, one file at a time; max_workers and batch_size are
+    then ignored. Otherwise the files are split into batches, each converted by
+    one soffice process, with batches running concurrently in worker threads.
+    Either way a file gets CONVERSION_TIMEOUT seconds before it is abandoned.
+
     Args:
         files_to_convert: List of Path objects for files to convert.
         output_dir: Directory Path to save the converted PDF files.
         progress: Rich Progress instance for displaying conversion status.
+        max_workers: Number of parallel soffice processes when UNO is unavailable.
+            Defaults to min(len(files_to_convert), os.cpu_count()).
+        on_success: Optional callback receiving each output PDF Path as soon as
+            its conversion finishes. Calls come in completion order, not the
+            order of files_to_convert; use the returned list for that.
+        batch_size: Maximum number of files passed to one soffice process when
+            UNO is unavailable.
 
     Returns:
         A tuple containing:
         - List[Path]: Paths of successfully converted PDF files.
         - List[Tuple[Path, str]]: Tuples of (original_file_path, error_message)
           for conversions that failed.
+        Both lists follow the order of files_to_convert. Files whose stem
+        matches an earlier file's (e.g. deck.ppt and deck.pptx) would overwrite
+        its PDF, so they are reported as failed instead of converted.
     """
     if not SOFFICE_COMMAND:
         # This should ideally be checked before calling this function, but acts as a safeguard
@@ -69,78 +729,75 @@ def convert_to_pdf(
     # Ensure the output directory exists
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    successful_pdfs: List[Path] = []
-    failed_conversions: List[Tuple[Path, str]] = []
-
     # Add a task to the Rich progress bar
     task = progress.add_task("[cyan]Converting files...", total=len(files_to_convert))
 
-    for input_file in files_to_convert:
-        # Update progress description for the current file
-        progress.update(task, description=f"[cyan]Converting: [bold]{input_file.name}[/bold]")
+    # Prefer one persistent LibreOffice listener; fall back to one soffice per file
+    server = None
+    if uno is not None and files_to_convert:
+        try:
+            server = LibreOfficeServer().start()
+        except Exception as e:
+            progress.console.print(
+                f"[yellow]Warning:[/yellow] Could not start a LibreOffice listener ({e}). "
+                "Converting with one soffice process per file."
+            )
 
-        # Define the expected output PDF path
-        output_pdf_path = output_dir / f"{input_file.stem}.pdf"
+    def show_elapsed(batch: List[Path], elapsed: float) -> None:
+        # Called from worker threads while soffice runs; Progress.update is thread-safe
+        names = batch[0].name if len(batch) == 1 else f"{batch[0].name} (+{len(batch) - 1} more)"
+        progress.update(task, description=f"[cyan]Converting: [bold]{names}[/bold] ({int(elapsed)}s)")
 
-        # Construct the command for LibreOffice headless conversion
-        command = [
-            SOFFICE_COMMAND,
-            "--headless",            # Run without GUI
-            "--convert-to", "pdf",   # Specify PDF as the output format
-            "--outdir", str(output_dir.resolve()), # Specify output directory (use absolute path)
-            str(input_file.resolve())              # Specify input file (use absolute path)
-        ]
+    # Each stem names one output PDF; later files with a taken stem are not
+    # converted, so parallel batches never write the same PDF
+    owners: Dict[str, Path] = {}
+    unique_files: List[Path] = []
+    clashes = []
+    for input_file in dict.fromkeys(files_to_convert):
+        owner = owners.setdefault(os.path.normcase(input_file.stem), input_file)
+        if owner == input_file:
+            unique_files.append(input_file)
+        else:
+            error_msg = f"Same output file ({input_file.stem}.pdf) as {owner.name}; not converted."
+            clashes.append((input_file, None, error_msg))
 
-        try:
-            # Execute the LibreOffice command
-            # Set a timeout (e.g., 120 seconds) to prevent indefinite hangs
-            result = subprocess.run(
-                command,
-                capture_output=True, # Capture stdout and stderr
-                text=True,           # Decode output as text
-                check=False,         # Do not raise exception on non-zero exit code
-                timeout=120          # Adjust timeout if needed (seconds)
-            )
+    def pool_conversions(files: List[Path]) -> Iterator[Tuple[Path, Optional[Path], Optional[str]]]:
+        return _pool_conversions(files, output_dir, max_workers, batch_size, on_poll=show_elapsed)
 
-            # Check for errors: non-zero return code OR 'error' in stderr OR output file missing
-            stderr_lower = result.stderr.lower() if result.stderr else ""
-            if result.returncode != 0:
-                error_msg = f"LibreOffice exited with code {result.returncode}. Stderr: {result.stderr or 'N/A'}"
-                failed_conversions.append((input_file, error_msg))
-                progress.console.print(f"[bold red]Error converting {input_file.name}:[/] {error_msg[:250]}...") # Print snippet
-            elif "error" in stderr_lower:
-                 error_msg = f"LibreOffice reported an error. Stderr: {result.stderr}"
-                 failed_conversions.append((input_file, error_msg))
-                 progress.console.print(f"[bold red]Error converting {input_file.name}:[/] {error_msg[:250]}...") # Print snippet
-            elif not output_pdf_path.exists():
-                 # Sometimes soffice exits 0 but fails silently or creates no output
-                 error_msg = "Conversion process finished but output PDF was not found."
-                 failed_conversions.append((input_file, error_msg))
-                 progress.console.print(f"[bold red]Error converting {input_file.name}:[/] {error_msg}")
-            else:
-                # Conversion successful
-                successful_pdfs.append(output_pdf_path)
+    if server is not None:
+        # The pool takes over any files left when a hung listener won't restart
+        conversions = _uno_conversions(server, unique_files, output_dir, fallback=pool_conversions)
+    else:
+        conversions = pool_conversions(unique_files)
+
+    results = {}
+    try:
+        for input_file, output_pdf_path, error_msg in itertools.chain(clashes, conversions):
+            results[input_file] = (output_pdf_path, error_msg)
+            if error_msg is None:
                 progress.update(task, description=f"[green]Converted: [bold]{input_file.name}[/bold]")
+                if on_success is not None:
+                    on_success(output_pdf_path)
+            else:
+                snippet = error_msg if len(error_msg) <= 250 else f"{error_msg[:250]}..."
+                progress.console.print(f"[bold red]Error converting {input_file.name}:[/] {snippet}")
+            # Advance the progress bar regardless of success or failure
+            progress.update(task, advance=1)
+    finally:
+        # Closing the generator cancels queued pool work promptly on Ctrl+C
+        conversions.close()
+        if server is not None:
+            server.stop()
 
-        except FileNotFoundError:
-             # This specific error means SOFFICE_COMMAND itself wasn't found
-             # Should be caught earlier, but good practice to handle
-             error_msg = f"'{SOFFICE_COMMAND}' command not found during execution."
-             failed_conversions.append((input_file, error_msg))
-             progress.console.print(f"[bold red]CRITICAL ERROR:[/bold red] {error_msg}")
-             # Maybe re-raise or handle more severely as it affects all conversions
-        except subprocess.TimeoutExpired:
-            error_msg = f"Conversion timed out after 120 seconds."
-            failed_conversions.append((input_file, error_msg))
-            progress.console.print(f"[bold red]Timeout converting {input_file.name}:[/] {error_msg}")
-        except Exception as e:
-            # Catch any other unexpected exceptions during subprocess execution
-            error_msg = f"An unexpected error occurred: {type(e).__name__}: {e}"
+    # Report results in the caller's order rather than completion order
+    successful_pdfs: List[Path] = []
+    failed_conversions: List[Tuple[Path, str]] = []
+    for input_file in files_to_convert:
+        output_pdf_path, error_msg = results[input_file]
+        if error_msg is None:
+            successful_pdfs.append(output_pdf_path)
+        else:
             failed_conversions.append((input_file, error_msg))
-            progress.console.print(f"[bold red]Unexpected error converting {input_file.name}:[/] {error_msg}")
-
-        # Advance the progress bar regardless of success or failure
-        progress.update(task, advance=1)
 
     # Finalize the progress bar task
     progress.update(task, description="[green]Conversion complete.", completed=len(files_to_convert), total=len(files_to_convert))
@@ -148,4 +805,4 @@ def convert_to_pdf(
     # progress.stop_task(task)
     # progress.remove_task(task)
 
-    return successful_pdfs, failed_conversions
\ No newline at end of file
+    return successful_pdfs, failed_conversions
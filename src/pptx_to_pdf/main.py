@@ -1,6 +1,8 @@
+import asyncio
+import contextlib
+import signal
 import sys
 from pathlib import Path
-import time
 
 from rich.console import Console
 from rich.panel import Panel
@@ -55,8 +57,29 @@ def display_summary(source_dir, output_dir, converted_count, merge_input_count,
     console.print(Panel(summary_text, title="[blue]Finished[/blue]", border_style="green", padding=(1, 2)))
 
 
+@contextlib.contextmanager
+def _interruptible():
+    """
+    Lets Ctrl+C raise KeyboardInterrupt inside blocking work run from run_async.
+
+    Since Python 3.11, asyncio.run() installs a SIGINT handler that only cancels
+    the main task, which blocking code never notices. Conversion and merging rely
+    on KeyboardInterrupt to kill soffice and close their files, so the default
+    handler is put back while they run.
+    """
+    previous = signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
 def run():
     """Main function to run the TUI application."""
+    # One event loop drives every prompt of the session, rather than one per prompt
+    asyncio.run(run_async())
+
+async def run_async():
+    """Runs the TUI application's steps, awaiting each prompt in turn."""
     display_welcome()
     final_merge_output_path = None
     final_pages_merged = 0
@@ -75,25 +98,21 @@ def run():
         console.print("- sudo dnf install libreoffice (Fedora)")
         console.print("- sudo pacman -S libreoffice-still (Arch)")
         # Ask if user wants to proceed *only* with merging existing PDFs
-        try:
-            proceed = ui.inquirer.confirm(
-                message="Proceed with PDF merging only (requires existing PDFs)?",
-                default=False
-            ).execute()
-            if not proceed:
-                console.print("[yellow]Exiting as requested.[/yellow]")
-                sys.exit(1)
-            libreoffice_available = False
-        except ui.AbortedCommand:
-             console.print("\nOperation aborted.")
-             sys.exit(1)
+        proceed = await ui.confirm_async("Proceed with PDF merging only (requires existing PDFs)?", default=False)
+        if proceed is None:
+            console.print("\nOperation aborted.")
+            sys.exit(1)
+        if not proceed:
+            console.print("[yellow]Exiting as requested.[/yellow]")
+            sys.exit(1)
+        libreoffice_available = False
     else:
         libreoffice_available = True
         console.print(f"[green]✓ Found LibreOffice command:[/green] {converter.SOFFICE_COMMAND}\n")
 
     # 2. Get Source Directory
     # =======================
-    source_dir = ui.get_directory("Enter the directory containing files to process:")
+    source_dir = await ui.get_directory_async("Enter the directory containing files to process:")
     if not source_dir:
         sys.exit(1) # Exit if directory selection was aborted or failed
     console.print(f"[cyan]Using source directory:[/cyan] {source_dir}")
@@ -112,23 +131,19 @@ def run():
         if not convertible_files:
             console.print("[yellow]No convertible office files found in this directory.[/yellow]")
             # Ask if user wants to skip conversion and proceed directly to merging
-            try:
-                 proceed = ui.inquirer.confirm(
-                     message="Skip conversion and proceed to merge existing PDFs?",
-                     default=True
-                 ).execute()
-                 if not proceed:
-                     console.print("Exiting.")
-                     sys.exit(0)
-                 # Set count to 0 if skipped this way
-                 final_converted_count = 0
-            except ui.AbortedCommand:
-                 console.print("\nOperation aborted.")
-                 sys.exit(1)
+            proceed = await ui.confirm_async("Skip conversion and proceed to merge existing PDFs?", default=True)
+            if proceed is None:
+                console.print("\nOperation aborted.")
+                sys.exit(1)
+            if not proceed:
+                console.print("Exiting.")
+                sys.exit(0)
+            # Set count to 0 if skipped this way
+            final_converted_count = 0
 
         else:
             # Prompt user to select which files to convert
-            files_to_convert = ui.select_files(
+            files_to_convert = await ui.select_files_async(
                 convertible_files,
                 prompt="Select files to convert to PDF:",
                 file_type_label="convertible office files"
@@ -141,14 +156,13 @@ def run():
                 console.print("[yellow]No files selected for conversion.[/yellow]")
                 final_converted_count = 0
                 # Ask again if they want to proceed to merge step
-                try:
-                    proceed = ui.inquirer.confirm(message="Proceed to merge existing PDFs?", default=True).execute()
-                    if not proceed:
-                        console.print("Exiting.")
-                        sys.exit(0)
-                except ui.AbortedCommand:
+                proceed = await ui.confirm_async("Proceed to merge existing PDFs?", default=True)
+                if proceed is None:
                     console.print("\nOperation aborted.")
                     sys.exit(1)
+                if not proceed:
+                    console.print("Exiting.")
+                    sys.exit(0)
             else:
                 # Proceed with conversion
                 console.print(f"\n[cyan]Preparing to convert {len(files_to_convert)} file(s) into:[/cyan] {conversion_output_dir}")
@@ -164,7 +178,7 @@ def run():
                     TimeElapsedColumn(),
                     console=console,
                     transient=False, # Keep progress visible after completion
-                ) as progress:
+                ) as progress, _interruptible():
                     successful_pdfs, failed_conversions = converter.convert_to_pdf(
                         files_to_convert, conversion_output_dir, progress
                     )
@@ -173,17 +187,19 @@ def run():
 
                 # Report conversion summary
                 if failed_conversions:
-                    console.print("\n[bold yellow]Conversion Issues:[/bold yellow]")
-                    for file, error in failed_conversions:
-                        # Error details were printed during conversion by the converter function
-                        console.print(f"- [yellow]{file.name}[/yellow]: Conversion failed.")
+                    # Error details were printed during conversion by the converter function;
+                    # the list is printed in one go rather than one write per file
+                    console.print("\n".join(
+                        ["\n[bold yellow]Conversion Issues:[/bold yellow]"]
+                        + [f"- [yellow]{file.name}[/yellow]: Conversion failed." for file, _ in failed_conversions]
+                    ))
                 if successful_pdfs:
                     console.print(f"\n[green]✓ Successfully converted {len(successful_pdfs)} file(s) to PDF.[/green]")
                 elif not failed_conversions: # No successes, no failures (shouldn't happen if files were selected)
                     console.print("[yellow]No files were converted.[/yellow]")
 
                 # Add a small delay for user to read the output
-                time.sleep(1)
+                await asyncio.sleep(1)
 
     else:
         # LibreOffice not available, skipping conversion section
@@ -214,52 +230,31 @@ def run():
         sys.exit(0)
 
     # Ask user if they want to proceed with merging
-    try:
-        do_merge = ui.inquirer.confirm(
-            message=f"Found {len(potential_merge_pool)} PDF(s). Select files to merge?",
-            default=True
-        ).execute()
-        if not do_merge:
-            console.print("\nSkipping merge step as requested.")
-            display_summary(source_dir, conversion_output_dir, final_converted_count, 0, None, 0)
-            sys.exit(0)
-    except ui.AbortedCommand:
+    do_merge = await ui.confirm_async(f"Found {len(potential_merge_pool)} PDF(s). Select files to merge?", default=True)
+    if do_merge is None:
         console.print("\nOperation aborted.")
         sys.exit(1)
-
-    # Prompt user to select which PDFs to merge from the pool
-    pdfs_to_merge = ui.select_files(potential_merge_pool, "Select PDF files to merge:", "PDF files")
-
-    if pdfs_to_merge is None: # User aborted selection
-        sys.exit(1)
-
-    if not pdfs_to_merge: # User selected none, but didn't abort
-        console.print("[yellow]No PDF files selected for merging.[/yellow]")
+    if not do_merge:
+        console.print("\nSkipping merge step as requested.")
         display_summary(source_dir, conversion_output_dir, final_converted_count, 0, None, 0)
         sys.exit(0)
 
-    # Order the selected PDFs if more than one was chosen
-    if len(pdfs_to_merge) > 1:
-        ordered_pdfs = ui.order_files(pdfs_to_merge)
-        if ordered_pdfs is None: # User aborted ordering
-            sys.exit(1)
-    else:
-        ordered_pdfs = pdfs_to_merge # Use the single selected file directly
-
-    if not ordered_pdfs: # Should not happen if selection worked, but safety check
-        console.print("[yellow]No files remaining after ordering step.[/yellow]")
+    # Select, order and name the merge on a single screen.
+    # Default saving location is the original source directory
+    wizard_result = await ui.merge_wizard_async(potential_merge_pool, default_name=f"{source_dir.name}_merged.pdf")
+    if wizard_result is None: # User aborted the merge wizard
+        sys.exit(1)
+    ordered_pdfs, output_merge_filename = wizard_result
+    if not ordered_pdfs: # User confirmed without ticking any file
+        console.print("[yellow]No PDF files selected for merging.[/yellow]")
         display_summary(source_dir, conversion_output_dir, final_converted_count, 0, None, 0)
         sys.exit(0)
 
-    console.print("\n[bold]Files will be merged in this order:[/bold]")
-    for i, file in enumerate(ordered_pdfs):
-        console.print(f"  [cyan]{i + 1}[/cyan]. {file.name}")
-
-    # Get the desired output filename for the merged PDF
-    # Default saving location is the original source directory
-    output_merge_filename = ui.get_output_filename(default_name=f"{source_dir.name}_merged.pdf")
-    if not output_merge_filename: # User aborted filename input
-        sys.exit(1)
+    # One print for the whole list rather than one write per file
+    console.print("\n".join(
+        ["\n[bold]Files will be merged in this order:[/bold]"]
+        + [f"  [cyan]{i + 1}[/cyan]. {file.name}" for i, file in enumerate(ordered_pdfs)]
+    ))
 
     final_output_path = source_dir / output_merge_filename
     final_merge_input_count = len(ordered_pdfs) # Store for summary
@@ -277,7 +272,7 @@ def run():
         TimeElapsedColumn(),
         console=console,
         transient=False, # Keep progress bar visible
-    ) as progress:
+    ) as progress, _interruptible():
         merge_success, final_pages_merged = merger.merge_pdfs(ordered_pdfs, final_output_path, progress)
 
     if merge_success:
@@ -1,92 +1,299 @@
+import errno
+import io
+import os
 from pathlib import Path
-from typing import List, Sequence, Tuple
+from typing import BinaryIO, Callable, List, Optional, Sequence, Tuple
 # Make sure to use pypdf, not the old PyPDF2
 from pypdf import PdfWriter, PdfReader
 from pypdf.errors import PdfReadError
 from rich.progress import Progress
 
+# pikepdf (a binding to the C++ qpdf library) is optional: it merges large batches
+# much faster than pure-Python pypdf, which remains the fallback
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+# --- Configuration ---
+# Environment variable selecting the merge backend: "pikepdf" or "pypdf".
+# Unset means pikepdf when it is installed, pypdf otherwise.
+MERGER_BACKEND_ENV = "PPTX_TO_PDF_MERGER"
+# Page entries not carried into the merged document: article beads (/B) point
+# into the source document's threads and /PieceInfo is private editor data.
+# Annotations are kept so hyperlinks on slides keep working. Both backends strip them.
+EXCLUDED_PAGE_KEYS = ("/B", "/PieceInfo")
+# Buffer size for writing the merged PDF (Python's default is 8 KiB)
+WRITE_BUFFER_SIZE = 1 << 20
+# /Producer entry recorded in the merged PDF's document information
+PDF_PRODUCER = "pptx-to-pdf"
+# --- End Configuration ---
+
+# PDF readers accept the %PDF- header anywhere in the first KiB of a file
+_PDF_MAGIC = b"%PDF-"
+_HEADER_SEARCH_SIZE = 1024
+
+class _NotAPdfError(Exception):
+    """Raised when an input doesn't start like a PDF, before any parsing is attempted."""
+
+def _check_pdf_header(head: bytes) -> None:
+    """Raises _NotAPdfError unless head (the start of a file) contains a PDF header."""
+    if head.find(_PDF_MAGIC, 0, _HEADER_SEARCH_SIZE) == -1:
+        raise _NotAPdfError
+
+# Exceptions meaning "this input is not a readable PDF" for either backend
+_READ_ERRORS: Tuple[type, ...] = (PdfReadError,) if pikepdf is None else (PdfReadError, pikepdf.PdfError)
+
+# Running out of file descriptors is the process's problem, not one input's
+_FD_EXHAUSTED = (errno.EMFILE, errno.ENFILE)
+
+def _read_pdf(pdf_path: Path) -> bytes:
+    """
+    Reads a whole PDF into memory and checks its header.
+
+    Every input stays open until the merged PDF is written, so inputs are held
+    as bytes rather than as open files or mappings (an mmap keeps a duplicate
+    file descriptor), and large merges can't run into the descriptor limit.
+    """
+    with open(pdf_path, "rb", buffering=0) as f:
+        data = f.readall()
+    # Reject non-PDFs (including empty files) before the parser spends time failing on them
+    _check_pdf_header(data)
+    return data
+
+def _write_file(output_path: Path, write: Callable[[BinaryIO], None], durable: bool) -> None:
+    """
+    Creates or truncates output_path and passes a buffered binary stream to write.
+
+    With durable set the data is fsync'ed before returning, so it survives a
+    crash or power loss; otherwise that (often slow) flush to disk is skipped.
+    """
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    with os.fdopen(fd, "wb", buffering=WRITE_BUFFER_SIZE) as fout:
+        write(fout)
+        if durable:
+            fout.flush()
+            os.fsync(fout.fileno())
+
+class _PypdfBackend:
+    """Merges pages with pypdf."""
+
+    def __init__(self):
+        self.writer = PdfWriter()
+
+    def open(self, pdf_path: Path) -> Sequence:
+        """Opens an input PDF and returns its pages."""
+        # Readers parse lazily, so each keeps its in-memory copy until the output is written.
+        # Using strict=False allows handling some slightly corrupted PDFs
+        return PdfReader(io.BytesIO(_read_pdf(pdf_path)), strict=False).pages
+
+    def add_page(self, page) -> None:
+        # add_page copies just the page; outlines and named destinations are
+        # never imported, which keeps the writer small for outline-heavy inputs
+        self.writer.add_page(page, excluded_keys=EXCLUDED_PAGE_KEYS)
+
+    def write(self, output_path: Path, durable: bool = False) -> None:
+        self.writer.add_metadata({"/Producer": PDF_PRODUCER})
+        # Presentations exported from the same template share fonts and images;
+        # store each distinct object once and drop anything left unreferenced
+        self.writer.compress_identical_objects()
+        _write_file(output_path, self.writer.write, durable)
+
+    def close(self) -> None:
+        self.writer.close()
+
+class _PikepdfBackend:
+    """
+    Merges pages with pikepdf/qpdf, which copies objects natively.
+
+    qpdf reads the stream data of copied pages only when the merged PDF is
+    saved, so every source stays open until then. Sources are opened from
+    their bytes (see _read_pdf), so this holds no file descriptors.
+    """
+
+    def __init__(self):
+        self.pdf = pikepdf.Pdf.new()
+        # qpdf copies foreign pages lazily, so sources must stay open until saved
+        self._sources: List[pikepdf.Pdf] = []
+
+    def open(self, pdf_path: Path) -> Sequence:
+        """Opens an input PDF and returns its pages."""
+        # The header check also keeps qpdf from trying to recover garbage as a damaged PDF
+        source = pikepdf.Pdf.open(io.BytesIO(_read_pdf(pdf_path)))
+        self._sources.append(source)
+        return source.pages
+
+    def add_page(self, page) -> None:
+        # The source is private to this merge, so strip it there before copying:
+        # looking the copy up again via self.pdf.pages[-1] costs O(pages) each time
+        for key in EXCLUDED_PAGE_KEYS:
+            if key in page.obj:
+                del page.obj[key]
+        self.pdf.pages.append(page)
+
+    def write(self, output_path: Path, durable: bool = False) -> None:
+        self.pdf.docinfo["/Producer"] = PDF_PRODUCER
+        _write_file(
+            output_path,
+            lambda fout: self.pdf.save(fout, linearize=False, object_stream_mode=pikepdf.ObjectStreamMode.generate),
+            durable,
+        )
+
+    def close(self) -> None:
+        self.pdf.close()
+        for source in self._sources:
+            source.close()
+
+def _select_backend(progress: Progress):
+    """Returns the merge backend chosen by MERGER_BACKEND_ENV and what is installed."""
+    requested = os.environ.get(MERGER_BACKEND_ENV, "").strip().lower()
+    if requested == "pypdf":
+        return _PypdfBackend()
+    if pikepdf is None:
+        if requested == "pikepdf":
+            progress.console.print(
+                f"[yellow]Warning:[/yellow] {MERGER_BACKEND_ENV}=pikepdf but pikepdf is not installed. Using pypdf."
+            )
+        return _PypdfBackend()
+    return _PikepdfBackend()
+
+def _open_input(merger, pdf_path: Path, progress: Progress) -> Optional[Sequence]:
+    """Opens one input with the backend. Prints why and returns None if it can't be used."""
+    filename = pdf_path.name
+    # No separate existence check: opening the file reports a missing path anyway
+    try:
+        pages = merger.open(pdf_path)
+        len(pages) # Forces the page tree to be parsed now rather than mid-merge
+        return pages
+    except (FileNotFoundError, IsADirectoryError):
+        progress.console.print(f"[yellow]Warning:[/yellow] Skipping non-existent file: {filename}")
+    except _NotAPdfError:
+        progress.console.print(f"[yellow]Warning:[/yellow] Skipping {filename}: not a PDF file.")
+    except _READ_ERRORS as e:
+        progress.console.print(f"[bold red]Error reading {filename}:[/] {e}. Skipping this file.")
+    except OSError as e:
+        # Out of file descriptors: every later input would fail too, so fail the merge instead
+        if e.errno in _FD_EXHAUSTED:
+            raise
+        progress.console.print(f"[bold red]Error reading {filename}:[/] {e}. Skipping this file.")
+    except Exception as e: # Catch other potential pypdf errors
+        progress.console.print(f"[bold red]Error adding {filename}:[/] {type(e).__name__}: {e}. Skipping.")
+    return None
+
+def _add_pages(merger, filename: str, pages: Sequence, progress: Progress, task) -> Tuple[int, bool]:
+    """
+    Copies pages into the output, advancing the progress task once per page.
+
+    Returns:
+        A tuple of (pages_added, completed) where completed is False if copying
+        stopped early on a malformed page.
+    """
+    pages_added = 0
+    try:
+        for page in pages:
+            merger.add_page(page)
+            pages_added += 1
+            progress.update(task, advance=1)
+    except Exception as e: # Catch potential pypdf errors on malformed pages
+        progress.console.print(f"[bold red]Error adding {filename}:[/] {type(e).__name__}: {e}. Skipping.")
+        return pages_added, False
+    return pages_added, True
+
+def _write_output(
+    merger,
+    output_path: Path,
+    pages_added_count: int,
+    skipped_files: int,
+    progress: Progress,
+    task,
+    task_total: int,
+    durable: bool = False,
+) -> bool:
+    """Writes the merged PDF if any pages were added and reports the outcome on the task."""
+    # Only write the output file if pages were successfully added
+    if pages_added_count > 0:
+        progress.update(task, description=f"[cyan]Writing final PDF ({pages_added_count} pages)...")
+        # Ensure the parent directory exists for the output file
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        merger.write(output_path, durable)
+        status_message = f"[green]Merging complete ({pages_added_count} pages)."
+        if skipped_files > 0:
+            status_message += f" [yellow]Skipped {skipped_files} file(s).[/yellow]"
+        progress.update(task, description=status_message, completed=task_total, total=task_total)
+        return True
+    progress.console.print("[bold red]Error:[/bold red] No valid PDF pages could be added. Output file not created.")
+    progress.update(task, description="[red]Merging failed.", completed=task_total, total=task_total)
+    return False
+
 def merge_pdfs(
     pdf_files: Sequence[Path], # Use Sequence for broader type hint (lists, tuples)
     output_path: Path,
     progress: Progress,
+    durable: bool = False,
 ) -> Tuple[bool, int]:
     """
     Merges a sequence of PDF files into a single output PDF.
 
+    Uses pikepdf when it is installed and pypdf otherwise; set the
+    PPTX_TO_PDF_MERGER environment variable to "pikepdf" or "pypdf" to choose.
+
     Args:
         pdf_files: An ordered sequence of Path objects for PDF files to merge.
         output_path: The Path object for the final merged PDF file.
         progress: Rich Progress instance for displaying merging status.
+        durable: If True, fsync the output before returning so it survives a crash.
 
     Returns:
         A tuple containing:
         - bool: True if merging was successful (at least one page added), False otherwise.
         - int: The total number of pages added to the merged document.
     """
-    merger = PdfWriter()
+    merger = _select_backend(progress)
     success = False
     pages_added_count = 0
     skipped_files = 0
 
-    # Add a task to the Rich progress bar
-    task = progress.add_task("[cyan]Merging PDFs...", total=len(pdf_files))
+    # Add a task to the Rich progress bar. It counts files while the inputs are
+    # opened, then pages while they are merged, so one long PDF doesn't look hung.
+    task_total = len(pdf_files)
+    task = progress.add_task("[cyan]Reading PDFs...", total=task_total)
 
     try:
+        # Open every input up front: this validates them and yields the total page count
+        inputs: List[Tuple[str, Sequence]] = []
         for i, pdf_path in enumerate(pdf_files):
-            filename = pdf_path.name
-            progress.update(task, description=f"[cyan]Adding: [bold]{filename}[/bold] ({i+1}/{len(pdf_files)})")
-
-            if not pdf_path.is_file():
-                progress.console.print(f"[yellow]Warning:[/yellow] Skipping non-existent file: {filename}")
-                skipped_files += 1
-                progress.update(task, advance=1)
-                continue
-
-            try:
-                # Open each PDF and append its pages
-                # Using strict=False allows handling some slightly corrupted PDFs
-                reader = PdfReader(str(pdf_path), strict=False)
-                merger.append(reader) # Append all pages from the reader
-                pages_added_count += len(reader.pages)
-
-            except PdfReadError as e:
-                progress.console.print(f"[bold red]Error reading {filename}:[/] {e}. Skipping this file.")
-                skipped_files += 1
-            except Exception as e: # Catch other potential pypdf errors
-                progress.console.print(f"[bold red]Error adding {filename}:[/] {type(e).__name__}: {e}. Skipping.")
+            progress.update(task, description=f"[cyan]Reading: [bold]{pdf_path.name}[/bold] ({i+1}/{len(pdf_files)})")
+            pages = _open_input(merger, pdf_path, progress)
+            if pages is None:
                 skipped_files += 1
-
+            else:
+                inputs.append((pdf_path.name, pages))
             progress.update(task, advance=1)
 
-        # Only write the output file if pages were successfully added
-        if pages_added_count > 0:
-            progress.update(task, description=f"[cyan]Writing final PDF ({pages_added_count} pages)...")
-            # Ensure the parent directory exists for the output file
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "wb") as fout:
-                merger.write(fout)
-            success = True
-            status_message = f"[green]Merging complete ({pages_added_count} pages)."
-            if skipped_files > 0:
-                status_message += f" [yellow]Skipped {skipped_files} file(s).[/yellow]"
-            progress.update(task, description=status_message, completed=len(pdf_files), total=len(pdf_files))
-        else:
-             progress.console.print("[bold red]Error:[/bold red] No valid PDF pages could be added. Output file not created.")
-             success = False
-             progress.update(task, description="[red]Merging failed.", completed=len(pdf_files), total=len(pdf_files))
+        # Re-weight the bar by pages and advance it once per copied page
+        task_total = sum(len(pages) for _, pages in inputs)
+        progress.update(task, total=task_total, completed=0)
+        for i, (filename, pages) in enumerate(inputs):
+            progress.update(task, description=f"[cyan]Adding: [bold]{filename}[/bold] ({i+1}/{len(inputs)})")
+            pages_added, completed = _add_pages(merger, filename, pages, progress, task)
+            pages_added_count += pages_added
+            if not completed:
+                skipped_files += 1
+
+        success = _write_output(merger, output_path, pages_added_count, skipped_files, progress, task, task_total, durable)
 
     except Exception as e:
         # Catch unexpected errors during the merging loop or writing phase
         progress.console.print(f"[bold red]Failed to merge PDFs due to unexpected error:[/bold red] {e}")
         success = False
         if not progress.tasks[task].finished:
-             progress.update(task, description="[red]Merging failed.", completed=len(pdf_files), total=len(pdf_files))
+             progress.update(task, description="[red]Merging failed.", completed=task_total, total=task_total)
     finally:
-        # Ensure the PdfWriter is closed to release resources
+        # Ensure the writer and all inputs are closed to release resources
         merger.close()
         # Optional: Stop/remove task if not already finished by success/failure paths
         # if not progress.tasks[task].finished:
         #    progress.stop_task(task)
         #    progress.remove_task(task)
 
-    return success, pages_added_count
\ No newline at end of file
+    return success, pages_added_count
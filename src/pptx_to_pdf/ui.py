@@ -1,43 +1,108 @@
-from typing import List, Optional, Sequence
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 from pathlib import Path
+import asyncio
+import functools
+from operator import attrgetter
+import os
 import sys
-import copy # Needed for managing choices list
-
-# Keep the imports as they are (assuming lowercase 'inquirerpy' worked)
-from InquirerPy import inquirer
-from InquirerPy.base.control import Choice
-# from inquirerpy.exceptions import AbortedCommand # REMOVED - Doesn't exist in v0.3.4
+import time
 
+# InquirerPy (~100 ms, mostly prompt_toolkit) is imported inside the functions
+# that use it, so importing this module stays cheap
 from rich.console import Console
-from rich.panel import Panel
 
 console = Console()
 
+T = TypeVar("T")
+
+def _prompt_guard(error_label: str) -> Callable[[Callable[..., T]], Callable[..., Optional[T]]]:
+    """
+    Decorates a prompt function so that cancelling or failing returns None.
+
+    Ctrl+C prints a cancellation notice; any other exception is printed after
+    error_label. Either way the wrapped function returns None, like an aborted prompt.
+    Works for both plain functions and coroutine functions.
+    """
+    def report(error: BaseException) -> None:
+        if isinstance(error, KeyboardInterrupt):
+            console.print("\nOperation cancelled by user (Ctrl+C).")
+        else:
+            console.print(f"[bold red]{error_label}:[/bold red] {error}")
+
+    def decorator(func: Callable[..., T]) -> Callable[..., Optional[T]]:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except (KeyboardInterrupt, Exception) as e:
+                    report(e)
+                    return None
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Optional[T]:
+            try:
+                return func(*args, **kwargs)
+            except (KeyboardInterrupt, Exception) as e:
+                report(e)
+                return None
+        return wrapper
+    return decorator
+
+# Each prompt below is split into a builder returning the InquirerPy prompt and a
+# finisher turning its answer into the result, so the plain version (execute())
+# and the *_async version (execute_async() on the caller's event loop) share them.
+
 # --- Directory Selection ---
-# (get_directory function remains as corrected in previous step)
+def _directory_prompt(prompt: str, default: str):
+    from InquirerPy import inquirer
+    return inquirer.filepath(
+        message=prompt,
+        default=default,
+        only_directories=True,
+        validate=os.path.isdir, # Runs per keystroke: a plain stat, no Path construction
+        invalid_message="Please select a valid directory.",
+    )
+
+def _finish_directory(path_str: Optional[str]) -> Optional[Path]:
+    if path_str is None:
+         console.print("\n[yellow]Operation cancelled or no input provided.[/yellow]")
+         return None
+    return Path(path_str).resolve()
+
+@_prompt_guard("Error getting directory")
 def get_directory(prompt: str = "Enter the directory containing your files:", default: str = ".") -> Optional[Path]:
     """Prompts user for a directory path using inquirerpy."""
-    try:
-        path_str = inquirer.filepath(
-            message=prompt,
-            default=default,
-            only_directories=True,
-            validate=lambda p: Path(p).is_dir(),
-            invalid_message="Please select a valid directory.",
-        ).execute()
-        if path_str is None:
-             console.print("\n[yellow]Operation cancelled or no input provided.[/yellow]")
-             return None
-        return Path(path_str).resolve()
-    except KeyboardInterrupt:
-        console.print("\nOperation cancelled by user (Ctrl+C).")
-        return None
-    except Exception as e:
-        console.print(f"[bold red]Error getting directory:[/bold red] {e}")
-        return None
+    return _finish_directory(_directory_prompt(prompt, default).execute())
+
+@_prompt_guard("Error getting directory")
+async def get_directory_async(prompt: str = "Enter the directory containing your files:", default: str = ".") -> Optional[Path]:
+    """Like get_directory, but runs the prompt on the caller's event loop."""
+    return _finish_directory(await _directory_prompt(prompt, default).execute_async())
 
 # --- File Selection ---
-# (select_files function remains as corrected in previous step)
+def _select_prompt(files: List[Path], prompt: str):
+    from InquirerPy import inquirer
+
+    # InquirerPy iterates the choices once, converting each to a dict. Handing it
+    # dicts from a generator skips building a Choice list and the asdict() deep
+    # copy of every Path, and the answer holds the caller's own Path objects.
+    choices = ({"name": file.name, "value": file} for file in files)
+    return inquirer.checkbox(
+        message=prompt,
+        choices=choices,
+        instruction="(Use Spacebar to select/deselect, Enter to confirm)",
+        border=True,
+    )
+
+def _finish_select(selected_files: Optional[List[Path]]) -> Optional[List[Path]]:
+    if selected_files is None: # Check for explicit None return
+        console.print("\n[yellow]Operation cancelled or no input provided.[/yellow]")
+        return None
+    return selected_files
+
+@_prompt_guard("Error during file selection")
 def select_files(
     files: List[Path],
     prompt: str = "Select files to process:",
@@ -47,135 +112,180 @@ def select_files(
     if not files:
         console.print(f"[yellow]No {file_type_label} found to select.[/yellow]")
         return []
+    return _finish_select(_select_prompt(files, prompt).execute())
 
-    choices = [Choice(value=file, name=file.name) for file in files]
-    try:
-        selected_files = inquirer.checkbox(
-            message=prompt,
-            choices=choices,
-            instruction="(Use Spacebar to select/deselect, Enter to confirm)",
-            border=True,
-        ).execute()
-        if selected_files is None: # Check for explicit None return
-            console.print("\n[yellow]Operation cancelled or no input provided.[/yellow]")
-            return None
-        return selected_files
-    except KeyboardInterrupt:
-        console.print("\nOperation cancelled by user (Ctrl+C).")
-        return None
-    except Exception as e:
-         console.print(f"[bold red]Error during file selection:[/bold red] {e}")
-         return None
+@_prompt_guard("Error during file selection")
+async def select_files_async(
+    files: List[Path],
+    prompt: str = "Select files to process:",
+    file_type_label: str = "files"
+) -> Optional[List[Path]]:
+    """Like select_files, but runs the prompt on the caller's event loop."""
+    if not files:
+        console.print(f"[yellow]No {file_type_label} found to select.[/yellow]")
+        return []
+    return _finish_select(await _select_prompt(files, prompt).execute_async())
 
-# --- Output Filename Input ---
-# (get_output_filename function remains as corrected in previous step)
-def get_output_filename(default_name: str = "merged_output.pdf") -> Optional[str]:
-    """Prompts user for the output filename for the merged PDF."""
-    try:
-        filename = inquirer.text(
-            message="Enter the desired name for the merged PDF file:",
-            default=default_name,
-            validate=lambda name: len(name.strip()) > 0 and name.lower().endswith(".pdf"),
-            invalid_message="Filename cannot be empty and must end with .pdf",
-        ).execute()
-        if filename is None: # Check for explicit None return
-            console.print("\n[yellow]Operation cancelled or no input provided.[/yellow]")
-            return None
-        return filename.strip()
-    except KeyboardInterrupt:
-        console.print("\nOperation cancelled by user (Ctrl+C).")
-        return None
-    except Exception as e:
-        console.print(f"[bold red]Error getting output filename:[/bold red] {e}")
-        return None
+# --- Output Filename Check ---
+def _is_pdf(name: str) -> bool:
+    """Checks that a file name ends with .pdf in any case (so it can't be blank either), lowercasing only the last three characters."""
+    # Slicing rather than indexing, so names shorter than four characters are simply rejected
+    return name[-4:-3] == "." and name[-3:].lower() == "pdf"
 
 
-# --- File Ordering (NEW Interactive Version) ---
-def order_files(files: Sequence[Path]) -> Optional[List[Path]]:
-    """
-    Allows the user to interactively specify the merge order by picking files one by one.
+# --- Confirmation ---
+def _confirm_prompt(message: str, default: bool):
+    from InquirerPy import inquirer
+    return inquirer.confirm(message=message, default=default)
 
-    Args:
-        files: The sequence (list/tuple) of Path objects selected for merging.
+@_prompt_guard("Error getting confirmation")
+def confirm(message: str, default: bool = True) -> Optional[bool]:
+    """Asks a yes/no question. Returns the answer, or None if the prompt was aborted."""
+    return _confirm_prompt(message, default).execute()
 
-    Returns:
-        A list of Path objects in the user-specified order, or None if aborted.
-        Returns the original list if 0 or 1 file is provided.
-    """
-    if not files or len(files) < 2:
-        # No ordering needed for 0 or 1 file
-        return list(files)
+@_prompt_guard("Error getting confirmation")
+async def confirm_async(message: str, default: bool = True) -> Optional[bool]:
+    """Like confirm, but runs the prompt on the caller's event loop."""
+    return await _confirm_prompt(message, default).execute_async()
 
-    console.print(Panel(
-        f"You selected {len(files)} files to merge. Please specify the desired order.",
-        title="[bold blue]Specify Merge Order[/bold blue]",
-        border_style="blue"
-        ))
 
-    ordered_files: List[Path] = []
-    # Work with a copy so we can remove items without affecting the original list
-    # Create choices mapping display name back to Path object
-    remaining_choices_map = {f.name: f for f in files}
+# --- Merge Wizard ---
+def _merge_wizard_application(files: Sequence[Path], default_name: str):
+    """
+    Builds a single-screen form for the whole merge step.
 
-    try:
-        for i in range(len(files)):
-            position = i + 1
-            # Get the names of the files still available to choose from
-            available_display_names = sorted(list(remaining_choices_map.keys()))
+    Files are ticked in the order they should be merged (CheckboxList keeps
+    its values in toggle order), the resulting order is shown live below the
+    list, and the output filename is edited in place. OK, or Enter in the
+    filename field, returns a tuple of (ordered_files, filename); with nothing
+    ticked ordered_files is empty. Cancel or Escape returns None.
+    """
+    from prompt_toolkit.application import Application
+    from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+    from prompt_toolkit.key_binding.bindings.focus import focus_next, focus_previous
+    from prompt_toolkit.key_binding.defaults import load_key_bindings
+    from prompt_toolkit.layout import HSplit, Layout
+    from prompt_toolkit.widgets import Button, CheckboxList, Dialog, Label, TextArea
 
-            if not available_display_names: # Should not happen if logic is correct
-                console.print("[bold red]Error:[/bold red] No more choices available unexpectedly.")
-                return None
+    file_list = CheckboxList(values=[(file, file.name) for file in files])
+    error_message = "" # Set by accept() when the form can't be submitted yet
 
-            selected_display_name = inquirer.select(
-                message=f"Select file for position #{position}:", # <-- REMOVED RICH TAGS
-                choices=available_display_names,
-                # Use fuzzy search if list is long? Maybe later enhancement.
-                # fuzzy=len(available_display_names) > 10,
-                border=True,
-                # cycle=False,
-            ).execute()
-
-            # Handle potential cancellation/abortion
-            if selected_display_name is None:
-                console.print("\n[yellow]Operation cancelled or no input provided during ordering.[/yellow]")
-                return None # Abort the whole ordering process
-
-            # Add the corresponding Path object to the ordered list
-            selected_file_path = remaining_choices_map[selected_display_name]
-            ordered_files.append(selected_file_path)
-
-            # Remove the selected file from the available choices for the next iteration
-            del remaining_choices_map[selected_display_name]
-
-            # Optional: Show progress
-            console.print(f"  [green]✓[/green] Position {position}: {selected_display_name}")
-
-        # Verify we got the correct number of files
-        if len(ordered_files) == len(files):
-            console.print("\n[green]File order confirmed.[/green]")
-            return ordered_files
+    def merge_order_text() -> str:
+        if not file_list.current_values:
+            return "Merge order: (none selected yet)"
+        return "Merge order: " + ", ".join(
+            f"{number}. {file.name}" for number, file in enumerate(file_list.current_values, start=1)
+        )
+
+    def accept() -> None:
+        nonlocal error_message
+        filename = filename_field.text.strip()
+        if not file_list.current_values:
+            # Nothing to merge, so the filename doesn't matter
+            application.exit(result=([], filename))
+        elif not _is_pdf(filename):
+            error_message = "Filename cannot be empty and must end with .pdf"
         else:
-            # This indicates a logic error in the loop
-            console.print("[bold red]Error:[/bold red] Ordering process failed unexpectedly.")
-            return None
+            application.exit(result=(list(file_list.current_values), filename))
 
-    except KeyboardInterrupt:
-        console.print("\nOperation cancelled by user (Ctrl+C).")
-        return None
-    except Exception as e:
-        console.print(f"[bold red]An unexpected error occurred during ordering:[/bold red] {e}")
-        return None
+    def cancel() -> None:
+        application.exit(result=None)
+
+    def _on_filename_enter(buffer) -> bool:
+        # Enter in the filename submits the form; returning True keeps the text if it stays open
+        accept()
+        return True
+
+    filename_field = TextArea(text=default_name, multiline=False, accept_handler=_on_filename_enter)
+
+    body = HSplit([
+        Label("Tick files in the order to merge them (Space; none skips merging), Tab to move between fields:"),
+        file_list,
+        Label(merge_order_text),
+        Label("Output file name (Enter to confirm):"),
+        filename_field,
+        Label(lambda: error_message, style="fg:ansired"),
+    ])
+    dialog = Dialog(
+        title="Merge PDFs",
+        body=body,
+        buttons=[Button("OK", handler=accept), Button("Cancel", handler=cancel)],
+        with_background=False,
+    )
 
-# --- (is_valid_order_string function is now removed/obsolete) ---
+    bindings = KeyBindings()
+    bindings.add("tab")(focus_next)
+    bindings.add("s-tab")(focus_previous)
+    bindings.add("escape")(lambda event: cancel())
+
+    @bindings.add("c-c")
+    def _interrupt(event) -> None:
+        event.app.exit(exception=KeyboardInterrupt)
+
+    application = Application(
+        layout=Layout(dialog, focused_element=file_list),
+        key_bindings=merge_key_bindings([load_key_bindings(), bindings]),
+        mouse_support=True,
+    )
+    return application
+
+def _finish_merge_wizard(result: Optional[Tuple[List[Path], str]]) -> Optional[Tuple[List[Path], str]]:
+    if result is None:
+        console.print("\n[yellow]Operation cancelled or no input provided.[/yellow]")
+    return result
+
+@_prompt_guard("Error in merge wizard")
+async def merge_wizard_async(files: Sequence[Path], default_name: str = "merged_output.pdf") -> Optional[Tuple[List[Path], str]]:
+    """
+    Selects, orders and names the merged PDF on one screen.
+
+    Replaces separate prompts for selecting, ordering and naming with a
+    single prompt_toolkit Application, so the form is drawn once and only
+    the focused field is redrawn while typing. Runs on the caller's event loop.
+
+    Args:
+        files: The PDFs available for merging, in display order.
+        default_name: Initial value of the output filename field.
+
+    Returns:
+        A tuple of (files in merge order, output filename), or None if aborted.
+        The list is empty if the user confirmed without ticking any file.
+    """
+    return _finish_merge_wizard(await _merge_wizard_application(files, default_name).run_async())
 
 # --- find_pdfs function remains the same ---
+# Results of find_pdfs per directory, keyed on the directory's mtime at scan time
+_pdf_cache: Dict[Path, Tuple[int, List[Path]]] = {}
+# Directories modified more recently than this aren't cached: a file added within
+# the filesystem's mtime granularity (up to 2 s) would leave the mtime unchanged
+_PDF_CACHE_SETTLE_NS = 2_000_000_000
+
 def find_pdfs(input_dir: Path) -> List[Path]:
-    """Finds PDF files in the specified directory."""
-    pdf_files = []
-    if not input_dir.is_dir():
+    """
+    Finds PDF files in the specified directory.
+
+    Listings are cached until the directory's mtime changes, so re-entering
+    the same directory doesn't scan it again. The returned list may be the
+    cached one and must not be modified.
+    """
+    try:
+        mtime = os.stat(input_dir).st_mtime_ns
+        cached = _pdf_cache.get(input_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # A single scandir pass: DirEntry.is_file() answers from the directory listing
+        # (except for symlinks), and non-PDF names are rejected before any Path is built.
+        # The name test is _is_pdf inlined, as a call per entry would cost what it saves.
+        with os.scandir(input_dir) as entries:
+            pdf_files = [
+                Path(entry.path) for entry in entries
+                if entry.name[-4:-3] == "." and entry.name[-3:].lower() == "pdf" and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
         return []
-    for item in input_dir.iterdir():
-        if item.is_file() and item.suffix.lower() == ".pdf":
-            pdf_files.append(item)
-    return sorted(pdf_files)
\ No newline at end of file
+    # Sort the new list in place; nothing to sort when no PDFs were found
+    if pdf_files:
+        pdf_files.sort(key=attrgetter("name"))
+    if time.time_ns() - mtime > _PDF_CACHE_SETTLE_NS:
+        _pdf_cache[input_dir] = (mtime, pdf_files)
+    return pdf_files
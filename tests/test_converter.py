@@ -1,5 +1,9 @@
 import pytest
+import shutil
+import struct
 import subprocess
+import threading
+import zipfile
 from unittest.mock import patch, MagicMock, call
 from pathlib import Path
 
@@ -39,12 +43,11 @@ def temp_files(tmp_path):
 # --- Test Cases ---
 
 # Test find_soffice
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice") # Looked up once at import
 @patch('shutil.which')
 def test_find_soffice_found(mock_which):
-    mock_which.side_effect = lambda cmd: "/usr/bin/soffice" if cmd == "soffice" else None
-    converter.SOFFICE_COMMAND = None # Reset global state if needed
     assert converter.find_soffice() == "/usr/bin/soffice"
-    assert mock_which.call_count == 1 # Only soffice should be checked first usually
+    mock_which.assert_not_called() # Answered from the import-time lookup, not PATH
 
 @patch('shutil.which')
 def test_find_soffice_fallback(mock_which):
@@ -67,4 +70,482 @@ def test_find_soffice_not_found(mock_which):
     assert mock_which.call_count == 2
 
 # Test get_convertible_files
-def test_get_convertible_files(temp_files
\ No newline at end of file
+def test_get_convertible_files(temp_files):
+    source_dir, _, file_pptx, file_odp, _ = temp_files
+    # Non-convertible files and directories are ignored, results are sorted
+    (source_dir / "subdir.pptx").mkdir()
+    assert converter.get_convertible_files(source_dir) == [file_pptx, file_odp]
+
+def test_get_convertible_files_suffix_case(tmp_path):
+    upper = tmp_path / "SLIDES.PPTX"
+    mixed = tmp_path / "deck.Odp"
+    upper.touch()
+    mixed.touch()
+    assert converter.get_convertible_files(tmp_path) == [upper, mixed]
+
+def make_cfb(*stream_names):
+    """Builds a minimal OLE compound file: header, one FAT sector, directory sectors."""
+    entries = [("Root Entry", 5)] + [(name, 2) for name in stream_names]
+    entries += [("", 0)] * (-len(entries) % 4) # Whole 512-byte sectors of 4 entries
+    directory_sectors = len(entries) // 4
+    free, end_of_chain, fat_sector = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD
+    # Sector 0 is the FAT, sectors 1.. the directory chain
+    chain = [fat_sector] + list(range(2, directory_sectors + 1)) + [end_of_chain]
+    header = (
+        b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1" + bytes(16)
+        + struct.pack("<HHHHH6xIIIIIIIII", 0x3E, 3, 0xFFFE, 9, 6, 0, 1, 1, 0, 4096, end_of_chain, 0, end_of_chain, 0)
+        + struct.pack("<109I", 0, *[free] * 108)
+    )
+    fat = struct.pack("<128I", *chain, *[free] * (128 - len(chain)))
+    directory = b"".join(
+        name.encode("utf-16-le").ljust(64, b"\0")
+        + struct.pack("<HB", 2 * len(name) + 2 if name else 0, kind).ljust(64, b"\0")
+        for name, kind in entries
+    )
+    return header + fat + directory
+
+def test_sniff_office_needs_a_powerpoint_stream(tmp_path):
+    # The stream sits in the second directory sector, so the FAT chain is followed
+    legacy_ppt = tmp_path / "old_deck"
+    legacy_ppt.write_bytes(make_cfb("\x05SummaryInformation", "Current User", "Pictures", "PowerPoint Document"))
+    # Same signature, other compound files: a thumbnail cache and an installer
+    thumbs = tmp_path / "Thumbs.db"
+    thumbs.write_bytes(make_cfb("Catalog", "256_1"))
+    installer = tmp_path / "setup.msi"
+    installer.write_bytes(make_cfb("\x05SummaryInformation"))
+    truncated = tmp_path / "truncated"
+    truncated.write_bytes(make_cfb("PowerPoint Document")[:600])
+
+    assert converter.get_convertible_files(tmp_path) == [legacy_ppt]
+
+def test_get_convertible_files_sniffs_content(tmp_path):
+    pptx_no_ext = tmp_path / "slides"
+    with zipfile.ZipFile(pptx_no_ext, "w") as archive:
+        archive.writestr("ppt/presentation.xml", "<p:presentation/>")
+    odp_misnamed = tmp_path / "talk.bak"
+    with zipfile.ZipFile(odp_misnamed, "w") as archive:
+        archive.writestr("mimetype", "application/vnd.oasis.opendocument.presentation")
+    legacy_ppt = tmp_path / "old_deck"
+    legacy_ppt.write_bytes(make_cfb("PowerPoint Document"))
+    # Other zip-based files and plain files are not presentations
+    with zipfile.ZipFile(tmp_path / "report", "w") as archive:
+        archive.writestr("word/document.xml", "<w:document/>")
+    (tmp_path / "notes").write_text("just text")
+
+    assert converter.get_convertible_files(tmp_path) == [legacy_ppt, pptx_no_ext, odp_misnamed]
+
+def test_sniff_office_cached_by_mtime_and_size(tmp_path):
+    legacy_ppt = tmp_path / "old_deck"
+    legacy_ppt.write_bytes(make_cfb("PowerPoint Document"))
+    assert converter._sniff_office(str(legacy_ppt)) is True
+    with patch("builtins.open", side_effect=AssertionError("file re-read")):
+        assert converter._sniff_office(str(legacy_ppt)) is True
+    # Changing the file invalidates the cached result
+    legacy_ppt.write_text("no longer a presentation")
+    assert converter._sniff_office(str(legacy_ppt)) is False
+
+def test_get_convertible_files_skips_known_suffixes(tmp_path):
+    # A presentation saved as .zip or .docx is left alone: those files are not opened
+    for name in ("bundle.zip", "letter.docx", "scan.pdf"):
+        with zipfile.ZipFile(tmp_path / name, "w") as archive:
+            archive.writestr("ppt/presentation.xml", "<p:presentation/>")
+    with patch("pptx_to_pdf.converter._sniff_office") as sniff:
+        assert converter.get_convertible_files(tmp_path) == []
+    sniff.assert_not_called()
+
+def test_sniff_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(converter, "_SNIFF_CACHE_MAX", 3)
+    monkeypatch.setattr(converter, "_sniff_cache", {})
+    for i in range(5):
+        path = tmp_path / f"file{i}"
+        path.write_text("plain")
+        converter._sniff_office(str(path))
+        assert len(converter._sniff_cache) <= 3
+
+def test_get_convertible_files_not_a_directory(tmp_path):
+    assert converter.get_convertible_files(tmp_path / "missing") == []
+    (tmp_path / "file.pptx").touch()
+    assert converter.get_convertible_files(tmp_path / "file.pptx") == []
+
+# Test convert_to_pdf
+class FakeSoffice:
+    """Stands in for subprocess.Popen, writing the PDFs a real soffice would."""
+
+    def __init__(self, command, **kwargs):
+        self.args = command
+        self.returncode = None
+        self.killed = False
+
+    def input_files(self):
+        # Input files follow the --outdir value; other options start with '-'
+        outdir_index = self.args.index("--outdir")
+        return [Path(arg) for arg in self.args[outdir_index + 2:] if not arg.startswith("-")]
+
+    def communicate(self, timeout=None):
+        outdir = Path(self.args[self.args.index("--outdir") + 1])
+        for input_file in self.input_files():
+            (outdir / f"{input_file.stem}.pdf").touch()
+        self.returncode = 0
+        return None, b""
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+class HangingSoffice(FakeSoffice):
+    """A soffice that never finishes until killed."""
+
+    def communicate(self, timeout=None):
+        if self.killed:
+            return None, b""
+        raise subprocess.TimeoutExpired(self.args, timeout)
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_success(mock_popen, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    successful, failed = converter.convert_to_pdf([file_pptx, file_odp], output_dir, mock_progress, max_workers=2)
+
+    assert successful == [output_dir / "test1.pdf", output_dir / "test2.pdf"]
+    assert failed == []
+    assert mock_popen.call_count == 2 # One batch per worker
+    for popen_call in mock_popen.call_args_list:
+        # Every conversion runs with an isolated LibreOffice profile, passed ahead of the other options
+        assert popen_call.args[0][1].startswith("-env:UserInstallation=file://")
+        # Start-up work a headless conversion doesn't need is skipped
+        assert {"--headless", "--norestore", "--nologo", "--nolockcheck"} <= set(popen_call.args[0])
+        # close_fds would rule out CPython's posix_spawn fast path
+        assert popen_call.kwargs["close_fds"] is False
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_batches_files_per_soffice_run(mock_popen, tmp_path, mock_progress):
+    inputs = [tmp_path / f"deck{i}.pptx" for i in range(5)]
+    for input_file in inputs:
+        input_file.touch()
+    output_dir = tmp_path / "output"
+
+    successful, failed = converter.convert_to_pdf(inputs, output_dir, mock_progress, max_workers=1, batch_size=3)
+
+    assert successful == [output_dir / f"deck{i}.pdf" for i in range(5)]
+    assert failed == []
+    commands = [c.args[0] for c in mock_popen.call_args_list]
+    assert [len(FakeSoffice(command).input_files()) for command in commands] == [3, 2]
+    # The single worker reuses its profile directory for every batch
+    assert commands[0][1] == commands[1][1]
+    assert Path(commands[0][1].split("file://", 1)[1]).is_dir()
+
+@pytest.mark.parametrize("returncode, stderr, expected", [
+    (0, b"Error: source file could not be loaded\n", "LibreOffice reported an error"),
+    (0, b"javaldx: Could not find a Java Runtime Environment!\n", "output PDF was not found"),
+    (0, b"no errors here\n", "output PDF was not found"),
+    (1, b"Unable to convert \xff\n", "exited with code 1"),
+])
+def test_batch_error_message(returncode, stderr, expected):
+    message = converter._batch_error_message(returncode, stderr)
+    assert expected in message
+    if returncode:
+        # Undecodable bytes don't break the message
+        assert "\ufffd" in message
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen")
+def test_convert_to_pdf_batch_partial_failure(mock_popen, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+
+    class NoOdpSoffice(FakeSoffice):
+        """Converts everything except .odp files, like a batch with one bad input."""
+        def input_files(self):
+            return [f for f in super().input_files() if f.suffix != ".odp"]
+    mock_popen.side_effect = NoOdpSoffice
+
+    successful, failed = converter.convert_to_pdf([file_pptx, file_odp], output_dir, mock_progress, max_workers=1)
+
+    assert mock_popen.call_count == 1
+    assert successful == [output_dir / "test1.pdf"]
+    assert [f for f, _ in failed] == [file_odp]
+    assert "output PDF was not found" in failed[0][1]
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_resolves_only_relative_paths(mock_popen, temp_files, mock_progress, monkeypatch):
+    source_dir, output_dir, file_pptx, file_odp, _ = temp_files
+    monkeypatch.chdir(source_dir)
+    original_resolve = Path.resolve
+
+    with patch.object(Path, "resolve", autospec=True, side_effect=original_resolve) as mock_resolve:
+        converter.convert_to_pdf([Path("test1.pptx"), file_odp], output_dir, mock_progress, max_workers=1)
+
+    # Only the relative input needed resolving; absolute paths are used as given
+    assert [c.args[0] for c in mock_resolve.call_args_list] == [Path("test1.pptx")]
+    command = mock_popen.call_args.args[0]
+    assert str(output_dir) in command
+    assert str(file_pptx) in command and str(file_odp) in command
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_on_success_callback(mock_popen, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    landed = []
+    converter.convert_to_pdf([file_pptx, file_odp], output_dir, mock_progress, on_success=landed.append)
+    assert sorted(landed) == [output_dir / "test1.pdf", output_dir / "test2.pdf"]
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "CONVERSION_TIMEOUT", 0)
+@patch("subprocess.Popen")
+def test_convert_to_pdf_reports_failures_in_input_order(mock_popen, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    processes = []
+
+    def popen(command, **kwargs):
+        soffice_cls = HangingSoffice if command[command.index("--outdir") + 2].endswith(".odp") else FakeSoffice
+        processes.append(soffice_cls(command, **kwargs))
+        return processes[-1]
+    mock_popen.side_effect = popen
+
+    successful, failed = converter.convert_to_pdf([file_odp, file_pptx], output_dir, mock_progress, max_workers=2)
+
+    assert successful == [output_dir / "test1.pdf"]
+    assert [f for f, _ in failed] == [file_odp]
+    assert "timed out" in failed[0][1]
+    # The hung soffice process was killed rather than left behind
+    assert [p.killed for p in processes if isinstance(p, HangingSoffice)] == [True]
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen")
+def test_convert_to_pdf_ignores_stale_output(mock_popen, temp_files, mock_progress):
+    _, output_dir, file_pptx, _, _ = temp_files
+    output_dir.mkdir()
+    stale_pdf = output_dir / "test1.pdf"
+    stale_pdf.write_bytes(b"%PDF-1.4 from an earlier run")
+
+    class FailingSoffice(FakeSoffice):
+        def communicate(self, timeout=None):
+            self.returncode = 1
+            return None, b"Error: source file could not be loaded"
+    mock_popen.side_effect = FailingSoffice
+
+    successful, failed = converter.convert_to_pdf([file_pptx], output_dir, mock_progress)
+
+    assert successful == []
+    assert [f for f, _ in failed] == [file_pptx]
+    assert not stale_pdf.exists()
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen")
+def test_convert_to_pdf_single_file_honours_exit_code(mock_popen, temp_files, mock_progress):
+    _, output_dir, file_pptx, _, _ = temp_files
+
+    class CrashingSoffice(FakeSoffice):
+        """Writes the PDF but exits with an error, e.g. crashing while saving it."""
+        def communicate(self, timeout=None):
+            super().communicate(timeout)
+            self.returncode = 1
+            return None, b""
+    mock_popen.side_effect = CrashingSoffice
+
+    successful, failed = converter.convert_to_pdf([file_pptx], output_dir, mock_progress)
+
+    assert successful == []
+    assert "exited with code 1" in failed[0][1]
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "CONVERSION_TIMEOUT", 0)
+@patch("subprocess.Popen")
+def test_convert_to_pdf_retries_stalled_batch_per_file(mock_popen, tmp_path, mock_progress):
+    inputs = [tmp_path / f"{name}.pptx" for name in ("a", "b", "hang", "c")]
+    for input_file in inputs:
+        input_file.touch()
+    output_dir = tmp_path / "output"
+
+    class StallingSoffice(FakeSoffice):
+        """Converts the files before hang.pptx, then never finishes it."""
+        def communicate(self, timeout=None):
+            if self.killed:
+                return None, b""
+            names = [f.name for f in self.input_files()]
+            if "hang.pptx" not in names:
+                return super().communicate(timeout)
+            for input_file in self.input_files()[:names.index("hang.pptx")]:
+                (output_dir / f"{input_file.stem}.pdf").touch()
+            raise subprocess.TimeoutExpired(self.args, timeout)
+    processes = []
+    def popen(command, **kwargs):
+        processes.append(StallingSoffice(command, **kwargs))
+        return processes[-1]
+    mock_popen.side_effect = popen
+
+    successful, failed = converter.convert_to_pdf(inputs, output_dir, mock_progress, max_workers=1)
+
+    assert successful == [output_dir / "a.pdf", output_dir / "b.pdf", output_dir / "c.pdf"]
+    assert [f for f, _ in failed] == [inputs[2]]
+    assert "timed out" in failed[0][1]
+    # a.pdf is kept; b.pdf may have been cut off by the kill, so it is redone with the rest
+    assert [p.input_files() for p in processes[1:]] == [[inputs[1]], [inputs[2]], [inputs[3]]]
+    assert not (output_dir / "hang.pdf").exists()
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_reports_duplicate_stems(mock_popen, tmp_path, mock_progress):
+    inputs = [tmp_path / name for name in ("deck", "deck.ppt", "deck.pptx", "other.odp")]
+    for input_file in inputs:
+        input_file.touch()
+    output_dir = tmp_path / "output"
+
+    successful, failed = converter.convert_to_pdf(inputs, output_dir, mock_progress, max_workers=4)
+
+    assert successful == [output_dir / "deck.pdf", output_dir / "other.pdf"]
+    assert [f for f, _ in failed] == [inputs[1], inputs[2]]
+    assert "Same output file (deck.pdf) as deck;" in failed[0][1]
+    # Only the first file with each stem reaches soffice
+    converted = [f for c in mock_popen.call_args_list for f in FakeSoffice(c.args[0]).input_files()]
+    assert sorted(converted) == [inputs[0], inputs[3]]
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch("subprocess.Popen")
+def test_convert_to_pdf_retries_crashed_batch_per_file(mock_popen, tmp_path, mock_progress):
+    inputs = [tmp_path / f"{name}.pptx" for name in ("a", "b", "crash", "c")]
+    for input_file in inputs:
+        input_file.touch()
+    output_dir = tmp_path / "output"
+
+    class CrashingSoffice(FakeSoffice):
+        """Converts the files before crash.pptx, starts writing its PDF, then dies."""
+        def communicate(self, timeout=None):
+            names = [f.name for f in self.input_files()]
+            if "crash.pptx" not in names:
+                return super().communicate(timeout)
+            for input_file in self.input_files()[:names.index("crash.pptx") + 1]:
+                (output_dir / f"{input_file.stem}.pdf").touch()
+            self.returncode = -11
+            return None, b""
+    processes = []
+    def popen(command, **kwargs):
+        processes.append(CrashingSoffice(command, **kwargs))
+        return processes[-1]
+    mock_popen.side_effect = popen
+
+    successful, failed = converter.convert_to_pdf(inputs, output_dir, mock_progress, max_workers=1)
+
+    assert successful == [output_dir / "a.pdf", output_dir / "b.pdf", output_dir / "c.pdf"]
+    assert [f for f, _ in failed] == [inputs[2]]
+    assert "exited with code -11" in failed[0][1]
+    # crash.pdf, the last PDF written, may be truncated: it is redone with the files after it
+    assert [p.input_files() for p in processes[1:]] == [[inputs[2]], [inputs[3]]]
+    assert not (output_dir / "crash.pdf").exists()
+
+@patch.object(converter, "SOFFICE_COMMAND", None)
+def test_convert_to_pdf_without_soffice(temp_files, mock_progress):
+    _, output_dir, file_pptx, _, _ = temp_files
+    with pytest.raises(FileNotFoundError):
+        converter.convert_to_pdf([file_pptx], output_dir, mock_progress)
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "uno", MagicMock())
+@patch.object(converter, "LibreOfficeServer")
+@patch("subprocess.Popen")
+def test_convert_to_pdf_uses_uno_server(mock_popen, mock_server_cls, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    server = mock_server_cls.return_value.start.return_value
+    server.convert.side_effect = lambda input_file, output_pdf: output_pdf.touch()
+
+    successful, failed = converter.convert_to_pdf([file_pptx, file_odp], output_dir, mock_progress)
+
+    assert successful == [output_dir / "test1.pdf", output_dir / "test2.pdf"]
+    assert failed == []
+    # One listener for the whole batch, no per-file soffice processes
+    mock_server_cls.return_value.start.assert_called_once()
+    server.stop.assert_called_once()
+    mock_popen.assert_not_called()
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "uno", MagicMock())
+@patch.object(converter, "LibreOfficeServer")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_falls_back_when_server_fails(mock_popen, mock_server_cls, temp_files, mock_progress):
+    _, output_dir, file_pptx, _, _ = temp_files
+    mock_server_cls.return_value.start.side_effect = TimeoutError("no listener")
+
+    successful, failed = converter.convert_to_pdf([file_pptx], output_dir, mock_progress)
+
+    assert successful == [output_dir / "test1.pdf"]
+    assert failed == []
+    mock_popen.assert_called_once()
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "CONVERSION_TIMEOUT", 0.2)
+@patch.object(converter, "uno", MagicMock())
+@patch.object(converter, "LibreOfficeServer")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_uno_timeout_restarts_server(mock_popen, mock_server_cls, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    server = mock_server_cls.return_value.start.return_value
+    killed = threading.Event()
+
+    def convert(input_file, output_pdf):
+        if input_file == file_odp:
+            # Hangs like a stuck loadComponentFromURL until soffice is killed
+            killed.wait(5)
+            raise RuntimeError("bridge disposed")
+        output_pdf.touch()
+    server.convert.side_effect = convert
+    server.kill.side_effect = killed.set
+
+    successful, failed = converter.convert_to_pdf([file_odp, file_pptx], output_dir, mock_progress)
+
+    assert successful == [output_dir / "test1.pdf"]
+    assert [f for f, _ in failed] == [file_odp]
+    assert "timed out" in failed[0][1]
+    server.kill.assert_called_once()
+    server.start.assert_called_once() # Restarted for the remaining file
+    mock_popen.assert_not_called()
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "CONVERSION_TIMEOUT", 0.2)
+@patch.object(converter, "uno", MagicMock())
+@patch.object(converter, "LibreOfficeServer")
+@patch("subprocess.Popen", side_effect=FakeSoffice)
+def test_convert_to_pdf_uno_timeout_falls_back_to_pool(mock_popen, mock_server_cls, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    server = mock_server_cls.return_value.start.return_value
+    killed = threading.Event()
+    server.convert.side_effect = lambda input_file, output_pdf: killed.wait(5)
+    server.kill.side_effect = killed.set
+    server.start.side_effect = RuntimeError("no listener")
+
+    successful, failed = converter.convert_to_pdf([file_odp, file_pptx], output_dir, mock_progress)
+
+    assert successful == [output_dir / "test1.pdf"]
+    assert [f for f, _ in failed] == [file_odp]
+    # The file after the hung one was converted by a plain soffice run
+    assert FakeSoffice(mock_popen.call_args.args[0]).input_files() == [file_pptx]
+
+@patch.object(converter, "SOFFICE_COMMAND", "/usr/bin/soffice")
+@patch.object(converter, "uno", MagicMock())
+@patch.object(converter, "LibreOfficeServer")
+@patch("subprocess.Popen")
+def test_convert_to_pdf_uno_crash_restarts_server(mock_popen, mock_server_cls, temp_files, mock_progress):
+    _, output_dir, file_pptx, file_odp, _ = temp_files
+    server = mock_server_cls.return_value.start.return_value
+    crashed = []
+
+    def convert(input_file, output_pdf):
+        if input_file == file_odp:
+            # soffice dies on a malformed deck, taking the UNO bridge with it
+            crashed.append(True)
+            raise RuntimeError("Binary URP bridge disposed during call")
+        output_pdf.touch()
+    server.convert.side_effect = convert
+    server.alive.side_effect = lambda: not crashed
+    server.start.side_effect = crashed.clear
+
+    successful, failed = converter.convert_to_pdf([file_odp, file_pptx], output_dir, mock_progress)
+
+    assert successful == [output_dir / "test1.pdf"]
+    assert [f for f, _ in failed] == [file_odp]
+    assert "bridge disposed" in failed[0][1]
+    server.start.assert_called_once() # Restarted for the remaining file
+    mock_popen.assert_not_called()
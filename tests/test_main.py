@@ -0,0 +1,29 @@
+import asyncio
+import os
+import signal
+import time
+import pytest
+
+# Import functions from the main module
+from pptx_to_pdf import main
+
+def test_interruptible_interrupts_blocking_work_under_asyncio_run():
+    handlers = []
+    finished = []
+
+    async def blocking_phase():
+        handlers.append(signal.getsignal(signal.SIGINT))
+        try:
+            with main._interruptible():
+                os.kill(os.getpid(), signal.SIGINT)
+                time.sleep(1) # Blocking work, like convert_to_pdf or merge_pdfs
+                finished.append(True)
+        finally:
+            handlers.append(signal.getsignal(signal.SIGINT))
+
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(blocking_phase())
+    # Ctrl+C stopped the blocking work itself, not just the task after it returned
+    assert finished == []
+    # The event loop's own handler is back once the blocking phase is over
+    assert handlers[0] is handlers[1]
@@ -1,6 +1,11 @@
+import errno
+import os
 import pytest
+import shutil
 from pathlib import Path
-from pypdf import PdfReader # Use pypdf imports
+from unittest.mock import MagicMock
+from pypdf import PdfReader, PdfWriter # Use pypdf imports
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject
 
 # --- Import Test Target ---
 # Assuming the package is installed editable or src is in PYTHONPATH
@@ -40,14 +45,13 @@ def create_dummy_pdf(filepath: Path, text: str = "Dummy Page", page_count: int =
 
 # --- Test Fixtures ---
 
-@pytest.fixture(scope="function") # Run per test function
-def dummy_pdfs(tmp_path):
+@pytest.fixture(scope="session") # ReportLab runs once for the whole test session
+def dummy_pdf_sources(tmp_path_factory):
     """
-    Fixture to create dummy PDF files in a temporary directory for testing.
+    Fixture to create the dummy source PDFs once per session.
     Uses reportlab (must be installed via dev dependencies).
     """
-    pdf_dir = tmp_path / "pdf_sources"
-    pdf_dir.mkdir()
+    pdf_dir = tmp_path_factory.mktemp("pdf_sources")
     pdf1_path = pdf_dir / "doc_a.pdf"
     pdf2_path = pdf_dir / "doc_b.pdf"
     pdf3_path = pdf_dir / "doc_c_multipage.pdf"
@@ -60,6 +64,16 @@ def dummy_pdfs(tmp_path):
     # Return the paths to the generated files
     return pdf1_path, pdf2_path, pdf3_path
 
+@pytest.fixture(scope="function") # Run per test function
+def dummy_pdfs(tmp_path, dummy_pdf_sources):
+    """
+    Fixture providing each test its own copies of the dummy PDF files.
+    Copying a few KB is far cheaper than rendering them again with reportlab.
+    """
+    pdf_dir = tmp_path / "pdf_sources"
+    pdf_dir.mkdir()
+    return tuple(Path(shutil.copy(source, pdf_dir)) for source in dummy_pdf_sources)
+
 @pytest.fixture
 def mock_progress():
     """Fixture to provide a mock Progress object that doesn't render."""
@@ -106,6 +120,75 @@ def test_merge_with_multipage_pdf(tmp_path, dummy_pdfs, mock_progress):
     except Exception as e:
         pytest.fail(f"Failed to read merged PDF: {e}")
 
+def test_merge_progress_counts_pages(tmp_path, dummy_pdfs, mock_progress):
+    """Tests that the progress bar is weighted by pages rather than by files."""
+    pdf1, _, pdf3_multi = dummy_pdfs
+    output_pdf = tmp_path / "merged_progress.pdf"
+
+    merger.merge_pdfs([pdf1, pdf3_multi], output_pdf, mock_progress)
+
+    task = mock_progress.tasks[0]
+    assert task.total == 3 # 1 page + 2 pages, not 2 files
+    assert task.completed == 3
+
+def test_merge_deduplicates_shared_objects(tmp_path, dummy_pdfs, mock_progress, monkeypatch):
+    """Tests that resources shared by several inputs are written only once (pypdf backend)."""
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, "pypdf")
+    pdf1, pdf2, _ = dummy_pdfs
+    output_pdf = tmp_path / "merged_dedup.pdf"
+
+    success, _ = merger.merge_pdfs([pdf1, pdf2], output_pdf, mock_progress)
+
+    assert success is True
+    # Both ReportLab documents embed an identical Helvetica font dictionary
+    assert output_pdf.read_bytes().count(b"/BaseFont /Helvetica") == 1
+
+@pytest.mark.parametrize("requested", ["pypdf", "pikepdf"])
+def test_merge_backend_selection(tmp_path, dummy_pdfs, mock_progress, monkeypatch, requested):
+    """Tests that both backends produce the same merge, and that pikepdf falls back to pypdf if missing."""
+    if requested == "pikepdf" and merger.pikepdf is None:
+        pytest.skip("pikepdf not installed")
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, requested)
+    pdf1, _, pdf3_multi = dummy_pdfs
+    output_pdf = tmp_path / f"merged_{requested}.pdf"
+
+    success, pages_merged = merger.merge_pdfs([pdf3_multi, pdf1], output_pdf, mock_progress)
+
+    assert success is True
+    assert pages_merged == 3
+    reader = PdfReader(output_pdf)
+    assert "Document C - Page 1" in reader.pages[0].extract_text()
+    assert "Document A - Page 1" in reader.pages[2].extract_text()
+
+@pytest.mark.parametrize("backend", ["pypdf", "pikepdf"])
+@pytest.mark.parametrize("durable", [False, True])
+def test_merge_output_producer_and_fsync(tmp_path, dummy_pdfs, mock_progress, monkeypatch, backend, durable):
+    """Tests that the output is tagged with our producer and fsync'ed only on request."""
+    if backend == "pikepdf" and merger.pikepdf is None:
+        pytest.skip("pikepdf is not installed")
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, backend)
+    fsync = MagicMock()
+    monkeypatch.setattr(merger.os, "fsync", fsync)
+    output_pdf = tmp_path / "merged_producer.pdf"
+
+    success, _ = merger.merge_pdfs(list(dummy_pdfs), output_pdf, mock_progress, durable=durable)
+
+    assert success is True
+    assert PdfReader(output_pdf).metadata["/Producer"] == merger.PDF_PRODUCER
+    assert fsync.called is durable
+
+def test_merge_pikepdf_requested_but_missing(tmp_path, dummy_pdfs, mock_progress, monkeypatch):
+    """Tests that requesting pikepdf without it installed still merges with pypdf."""
+    monkeypatch.setattr(merger, "pikepdf", None)
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, "pikepdf")
+    pdf1, pdf2, _ = dummy_pdfs
+    output_pdf = tmp_path / "merged_fallback.pdf"
+
+    success, pages_merged = merger.merge_pdfs([pdf1, pdf2], output_pdf, mock_progress)
+
+    assert success is True
+    assert pages_merged == 2
+
 def test_merge_order(tmp_path, dummy_pdfs, mock_progress):
     """Tests if the merge order is respected (check content if possible/needed)."""
     pdf1, pdf2, pdf3_multi = dummy_pdfs
@@ -157,6 +240,120 @@ def test_merge_skips_non_existent_file(tmp_path, dummy_pdfs, mock_progress):
     # Note: Capturing console output from Progress can be complex.
     # Rely on function behavior (success=True, pages_merged=1) to infer skipping occurred.
 
+@pytest.mark.parametrize("backend", ["pypdf", "pikepdf"])
+def test_merge_warns_on_missing_and_directory_inputs(tmp_path, dummy_pdfs, mock_progress, monkeypatch, backend):
+    """Tests that paths which aren't files are reported as non-existent and skipped."""
+    if backend == "pikepdf" and merger.pikepdf is None:
+        pytest.skip("pikepdf is not installed")
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, backend)
+    pdf1, _, _ = dummy_pdfs
+    output_pdf = tmp_path / "merged_missing.pdf"
+    console_print = MagicMock()
+    monkeypatch.setattr(mock_progress.console, "print", console_print)
+
+    success, pages_merged = merger.merge_pdfs([tmp_path / "missing.pdf", tmp_path, pdf1], output_pdf, mock_progress)
+
+    assert success is True
+    assert pages_merged == 1
+    warnings = [c.args[0] for c in console_print.call_args_list if "non-existent" in c.args[0]]
+    assert len(warnings) == 2
+
+@pytest.mark.parametrize("backend", ["pypdf", "pikepdf"])
+def test_merge_strips_excluded_page_keys(tmp_path, mock_progress, monkeypatch, backend):
+    """Tests that both backends drop EXCLUDED_PAGE_KEYS from merged pages."""
+    if backend == "pikepdf" and merger.pikepdf is None:
+        pytest.skip("pikepdf is not installed")
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, backend)
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=72, height=72)
+    page[NameObject("/PieceInfo")] = DictionaryObject()
+    page[NameObject("/B")] = ArrayObject()
+    source = tmp_path / "annotated.pdf"
+    writer.write(source)
+    output_pdf = tmp_path / "merged_stripped.pdf"
+
+    success, pages_merged = merger.merge_pdfs([source], output_pdf, mock_progress)
+
+    assert success is True
+    merged_page = PdfReader(output_pdf).pages[0]
+    assert not any(key in merged_page for key in merger.EXCLUDED_PAGE_KEYS)
+
+def test_merge_keeps_given_order(tmp_path, dummy_pdfs, mock_progress):
+    """Tests that inputs are merged in the given order, repeats included."""
+    pdf1, pdf2, pdf3 = dummy_pdfs
+    output_pdf = tmp_path / "merged_order.pdf"
+
+    success, pages_merged = merger.merge_pdfs([pdf3, pdf1, pdf2, pdf1], output_pdf, mock_progress)
+
+    assert success is True
+    texts = [page.extract_text() for page in PdfReader(output_pdf).pages]
+    assert [t.split()[1] for t in texts] == ["C", "C", "A", "B", "A"]
+
+@pytest.mark.parametrize("backend", ["pypdf", "pikepdf"])
+def test_merge_rejects_non_pdf_before_parsing(tmp_path, dummy_pdfs, mock_progress, monkeypatch, backend):
+    """Tests that files without a PDF header are skipped with a 'not a PDF' warning."""
+    if backend == "pikepdf" and merger.pikepdf is None:
+        pytest.skip("pikepdf is not installed")
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, backend)
+    console_print = MagicMock()
+    monkeypatch.setattr(mock_progress.console, "print", console_print)
+    pdf1, _, _ = dummy_pdfs
+    renamed = tmp_path / "renamed.pdf"
+    renamed.write_bytes(b"PK\x03\x04 this is really a zip archive")
+    empty_pdf = tmp_path / "empty.pdf"
+    empty_pdf.touch()
+    output_pdf = tmp_path / "merged_non_pdf.pdf"
+
+    success, pages_merged = merger.merge_pdfs([renamed, empty_pdf, pdf1], output_pdf, mock_progress)
+
+    assert success is True
+    assert pages_merged == 1
+    warnings = [c.args[0] for c in console_print.call_args_list if "not a PDF" in c.args[0]]
+    assert len(warnings) == 2
+
+def test_merge_skips_empty_file(tmp_path, dummy_pdfs, mock_progress):
+    """Tests that a zero-byte input is skipped."""
+    pdf1, _, _ = dummy_pdfs
+    empty_pdf = tmp_path / "empty.pdf"
+    empty_pdf.touch()
+    output_pdf = tmp_path / "merged_skip_empty.pdf"
+
+    success, pages_merged = merger.merge_pdfs([empty_pdf, pdf1], output_pdf, mock_progress)
+
+    assert success is True
+    assert pages_merged == 1
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd")
+@pytest.mark.parametrize("backend_name", ["pypdf", "pikepdf"])
+def test_backend_keeps_no_file_open(dummy_pdfs, backend_name):
+    """Tests that opened inputs hold no file descriptor until the merge is written."""
+    if backend_name == "pikepdf" and merger.pikepdf is None:
+        pytest.skip("pikepdf is not installed")
+    backend = merger._PypdfBackend() if backend_name == "pypdf" else merger._PikepdfBackend()
+    fds_before = len(os.listdir("/proc/self/fd"))
+    for pdf_path in dummy_pdfs:
+        len(backend.open(pdf_path))
+    assert len(os.listdir("/proc/self/fd")) == fds_before
+    backend.close()
+
+def test_merge_fails_when_out_of_file_descriptors(tmp_path, dummy_pdfs, mock_progress, monkeypatch):
+    """Tests that EMFILE fails the whole merge instead of silently skipping inputs."""
+    monkeypatch.setenv(merger.MERGER_BACKEND_ENV, "pypdf")
+    pdf1, pdf2, _ = dummy_pdfs
+    read_pdf = merger._read_pdf
+
+    def read_or_run_out(pdf_path):
+        if pdf_path == pdf2:
+            raise OSError(errno.EMFILE, "Too many open files")
+        return read_pdf(pdf_path)
+    monkeypatch.setattr(merger, "_read_pdf", read_or_run_out)
+    output_pdf = tmp_path / "merged_emfile.pdf"
+
+    success, pages_merged = merger.merge_pdfs([pdf1, pdf2], output_pdf, mock_progress)
+
+    assert success is False
+    assert not output_pdf.exists()
+
 def test_merge_empty_input_list(tmp_path, mock_progress):
     """Tests merging with an empty list of input files."""
     output_pdf = tmp_path / "merged_empty.pdf"
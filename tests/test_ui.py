@@ -1,86 +1,106 @@
+import asyncio
+import os
+import subprocess
+import sys
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from pathlib import Path
+from collections import namedtuple
+from contextlib import nullcontext
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
 
 # Import functions from the ui module
 from pptx_to_pdf import ui
 
 # --- Test UI Helper Functions ---
 
-# Test is_valid_order_string (assuming it might still be used or for reference)
-# Note: This will be removed/obsolete with the new reordering UI, but included for completeness of testing existing helpers
-@pytest.mark.parametrize("input_str, count, expected", [
-    ("1,2,3", 3, True),
-    (" 3 , 1 , 2 ", 3, True),
-    ("1,3,2", 3, True),
-    ("1", 1, True),
-    ("1,2", 3, False),        # Wrong count
-    ("1,2,2", 3, False),        # Duplicate
-    ("1,4,2", 3, False),        # Number out of range
-    ("1,0,2", 3, False),        # Number out of range (zero)
-    ("1,a,2", 3, False),        # Not a number
-    ("", 3, False),             # Empty string
-    ("1, 2,", 3, False),        # Trailing comma, invalid parse likely
-    (None, 3, False),           # None input
+@pytest.mark.parametrize("name, expected", [
+    ("a.pdf", True),
+    ("A.pDf", True),
+    ("Merged.PDF", True),
+    (".pdf", True),
+    ("merged", False),
+    ("merged.pdf ", False), # Trailing space is not stripped before the suffix check
+    ("", False),
+    ("   ", False),
+    ("pdf", False),
+    ("a.pdfx", False),
+    ("apdf", False),
+    ("a.odp", False),
 ])
-def test_is_valid_order_string(input_str, count, expected):
-     # If the new UI removes this function, this test becomes obsolete
-     # For now, assume it exists for testing purposes if needed elsewhere
-     if hasattr(ui, 'is_valid_order_string'):
-         assert ui.is_valid_order_string(input_str, count) == expected
-     else:
-         pytest.skip("is_valid_order_string function not found (likely removed by new UI)")
+def test_is_pdf(name, expected):
+    assert ui._is_pdf(name) == expected
 
 
 # Test find_pdfs
-@patch('pathlib.Path.iterdir')
-@patch('pathlib.Path.is_dir')
-def test_find_pdfs(mock_is_dir, mock_iterdir, tmp_path):
-    mock_is_dir.return_value = True
-    # Create mock Path objects for iterdir to return
-    pdf1 = MagicMock(spec=Path)
-    pdf1.name = "a.pdf"
-    pdf1.suffix = ".pdf"
-    pdf1.is_file.return_value = True
-
-    pdf2 = MagicMock(spec=Path)
-    pdf2.name = "c.PDF" # Test case insensitivity
-    pdf2.suffix = ".PDF"
-    pdf2.is_file.return_value = True
-
-    txt1 = MagicMock(spec=Path)
-    txt1.name = "b.txt"
-    txt1.suffix = ".txt"
-    txt1.is_file.return_value = True
-
-    subdir = MagicMock(spec=Path)
-    subdir.name = "subdir"
-    subdir.is_file.return_value = False
-
-    mock_iterdir.return_value = [pdf1, txt1, subdir, pdf2]
-
-    # Call the function under test
-    found_pdfs = ui.find_pdfs(tmp_path) # tmp_path is just a placeholder Path
-
-    # Assertions
-    assert mock_is_dir.called_once_with()
-    assert mock_iterdir.called_once_with()
-    assert len(found_pdfs) == 2
-    # Check sorting and correct objects returned
-    assert found_pdfs[0] == pdf1 # 'a.pdf' should come before 'c.PDF'
-    assert found_pdfs[1] == pdf2
-
-@patch('pathlib.Path.is_dir')
-def test_find_pdfs_not_a_directory(mock_is_dir):
-    mock_is_dir.return_value = False
-    assert ui.find_pdfs(Path("dummy/path")) == []
-    assert mock_is_dir.called_once_with()
+class Entry(namedtuple("Entry", "name path is_file_ret")):
+    """A light stand-in for os.DirEntry."""
+    def is_file(self):
+        return self.is_file_ret
+
+def test_find_pdfs(tmp_path):
+    ui._pdf_cache.clear()
+    entries = [
+        Entry("a.pdf", "/dir/a.pdf", True),
+        Entry("b.txt", "/dir/b.txt", True),
+        Entry("subdir", "/dir/subdir", False),
+        Entry("c.PDF", "/dir/c.PDF", True), # Test case insensitivity
+        Entry("d.pdf", "/dir/d.pdf", False), # A directory named like a PDF
+    ]
+
+    with patch('os.scandir', return_value=nullcontext(entries)) as mock_scandir:
+        found_pdfs = ui.find_pdfs(tmp_path) # tmp_path is just a placeholder Path
+
+    mock_scandir.assert_called_once_with(tmp_path)
+    # Check sorting and correct objects returned: 'a.pdf' should come before 'c.PDF'
+    assert found_pdfs == [Path("/dir/a.pdf"), Path("/dir/c.PDF")]
+
+def test_find_pdfs_scans_directory(tmp_path):
+    for name in ("b.pdf", "a.txt", "C.PDF"):
+        (tmp_path / name).touch()
+    (tmp_path / "folder.pdf").mkdir() # A directory with a .pdf name is not a PDF
+    (tmp_path / "link.pdf").symlink_to(tmp_path / "b.pdf") # Symlinked PDFs are still found
+
+    assert ui.find_pdfs(tmp_path) == [tmp_path / "C.PDF", tmp_path / "b.pdf", tmp_path / "link.pdf"]
+
+def _age_directory(path, seconds=60):
+    """Backdates a directory's mtime so find_pdfs considers it settled."""
+    mtime = path.stat().st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+def test_find_pdfs_caches_until_directory_changes(tmp_path):
+    ui._pdf_cache.clear()
+    (tmp_path / "a.pdf").touch()
+    _age_directory(tmp_path)
+
+    first = ui.find_pdfs(tmp_path)
+    with patch('os.scandir', side_effect=AssertionError("directory scanned again")):
+        assert ui.find_pdfs(tmp_path) is first # Unchanged directory: served from the cache
+
+    (tmp_path / "b.pdf").touch() # Adding a file bumps the directory's mtime
+    _age_directory(tmp_path, seconds=30)
+    assert ui.find_pdfs(tmp_path) == [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+
+def test_find_pdfs_skips_cache_for_recently_modified_directory(tmp_path):
+    ui._pdf_cache.clear()
+    (tmp_path / "a.pdf").touch()
+
+    ui.find_pdfs(tmp_path)
+
+    assert tmp_path not in ui._pdf_cache
+
+def test_find_pdfs_not_a_directory(tmp_path):
+    assert ui.find_pdfs(tmp_path / "missing") == []
+    (tmp_path / "file.pdf").touch()
+    assert ui.find_pdfs(tmp_path / "file.pdf") == []
 
 # --- Tests for Interactive Functions (using mocking) ---
 # These are more complex and demonstrate the principle
 
-@patch('inquirerpy.inquirer.filepath') # Patch the specific prompt function
-def test_get_directory_success(mock_filepath):
+@patch('InquirerPy.inquirer.filepath') # Patch the specific prompt function
+def test_get_directory_success(mock_filepath, tmp_path):
     # Configure the mock prompt to return a specific path when execute() is called
     mock_prompt = MagicMock()
     mock_prompt.execute.return_value = "/fake/selected/dir"
@@ -93,8 +113,10 @@ def test_get_directory_success(mock_filepath):
     assert result == Path("/fake/selected/dir").resolve()
     mock_filepath.assert_called_once() # Check inquirer.filepath was called
     mock_prompt.execute.assert_called_once() # Check execute was called on the prompt object
+    validate = mock_filepath.call_args.kwargs["validate"]
+    assert validate(str(tmp_path)) and not validate(str(tmp_path / "missing"))
 
-@patch('inquirerpy.inquirer.filepath')
+@patch('InquirerPy.inquirer.filepath')
 def test_get_directory_aborted(mock_filepath):
     # Configure the mock prompt to raise KeyboardInterrupt on execute()
     mock_prompt = MagicMock()
@@ -107,5 +129,102 @@ def test_get_directory_aborted(mock_filepath):
     # Assertions
     assert result is None # Function should return None on abort
 
-# Add similar mock-based tests for select_files, get_output_filename if desired,
-# though they become increasingly complex to simulate all user interactions.
\ No newline at end of file
+# Add similar mock-based tests for select_files if desired,
+# though they become increasingly complex to simulate all user interactions.
+
+@patch('InquirerPy.inquirer.checkbox')
+def test_select_files_builds_choices_lazily(mock_checkbox):
+    files = [Path("/x/a.pdf"), Path("/x/b.pdf")]
+
+    def fake_checkbox(choices, **kwargs):
+        assert not isinstance(choices, list) # A generator, not a materialized list
+        prompt = MagicMock()
+        prompt.execute.return_value = [choice["value"] for choice in choices] # "Select all"
+        return prompt
+    mock_checkbox.side_effect = fake_checkbox
+
+    selected = ui.select_files(files)
+
+    assert selected == files
+    assert all(s is f for s, f in zip(selected, files)) # The caller's own Path objects
+
+@patch('InquirerPy.inquirer.checkbox')
+def test_select_files_error_returns_none(mock_checkbox):
+    mock_checkbox.return_value.execute.side_effect = RuntimeError("terminal gone")
+
+    with patch.object(ui.console, 'print') as mock_print:
+        assert ui.select_files([Path("a.pdf")]) is None
+
+    assert "Error during file selection" in mock_print.call_args.args[0]
+    assert ui.select_files.__name__ == "select_files" # The guard keeps the wrapped function's metadata
+
+def test_importing_ui_does_not_load_inquirerpy():
+    # A fresh interpreter, since other tests have already imported InquirerPy here
+    code = "import sys, pptx_to_pdf.ui; sys.exit('InquirerPy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
+    assert result.returncode == 0
+
+@pytest.mark.parametrize("answer, side_effect, expected", [
+    (True, None, True),
+    (False, None, False),
+    (None, KeyboardInterrupt, None),
+])
+@patch('InquirerPy.inquirer.confirm')
+def test_confirm(mock_confirm, answer, side_effect, expected):
+    mock_confirm.return_value.execute.return_value = answer
+    mock_confirm.return_value.execute.side_effect = side_effect
+
+    assert ui.confirm("Continue?") is expected
+
+@patch('InquirerPy.inquirer.filepath')
+def test_get_directory_async_aborted(mock_filepath):
+    mock_filepath.return_value.execute_async = AsyncMock(side_effect=KeyboardInterrupt)
+
+    assert asyncio.run(ui.get_directory_async()) is None
+    mock_filepath.return_value.execute.assert_not_called() # No nested event loop per prompt
+
+# --- Merge wizard, driven through prompt_toolkit's pipe input ---
+TAB, SHIFT_TAB, ENTER, ESCAPE = "\t", "\x1b[Z", "\r", "\x1b"
+WIZARD_FILES = [Path("/x/a.pdf"), Path("/x/b.pdf"), Path("/x/c.pdf")]
+
+def run_wizard_with_keys(*keys, default_name="merged_output.pdf"):
+    with create_pipe_input() as pipe_input, create_app_session(input=pipe_input, output=DummyOutput()):
+        for key in keys:
+            pipe_input.send_text(key)
+        return asyncio.run(ui.merge_wizard_async(WIZARD_FILES, default_name=default_name))
+
+def test_merge_wizard_orders_files_by_selection():
+    result = run_wizard_with_keys(
+        "jj ", "kk ",            # Tick c.pdf first, then a.pdf
+        TAB, "\x01\x0bdeck.PDF", # Replace the filename (Ctrl+A, Ctrl+K)
+        TAB, ENTER,              # OK
+    )
+
+    assert result == ([Path("/x/c.pdf"), Path("/x/a.pdf")], "deck.PDF")
+
+def test_merge_wizard_rejects_invalid_filename():
+    result = run_wizard_with_keys(
+        " ", TAB, "\x01\x0bdeck", TAB, ENTER, # Not a .pdf name: stays open
+        SHIFT_TAB, ".pdf", TAB, ENTER,
+    )
+
+    assert result == ([Path("/x/a.pdf")], "deck.pdf")
+
+def test_merge_wizard_enter_in_filename_submits():
+    result = run_wizard_with_keys(" ", TAB, "\x01\x0bdeck.pdf", ENTER) # Enter right after typing the name
+
+    assert result == ([Path("/x/a.pdf")], "deck.pdf")
+
+def test_merge_wizard_invalid_filename_stays_open():
+    # The first Enter is rejected (no .pdf suffix); the corrected name then submits
+    result = run_wizard_with_keys(" ", TAB, "\x01\x0bdeck", ENTER, ".pdf", ENTER)
+
+    assert result == ([Path("/x/a.pdf")], "deck.pdf")
+
+def test_merge_wizard_nothing_ticked_skips_merge():
+    # OK without ticking anything confirms an empty selection rather than cancelling
+    assert run_wizard_with_keys(TAB, TAB, ENTER) == ([], "merged_output.pdf")
+
+@pytest.mark.parametrize("key", [ESCAPE, "\x03"]) # Escape, Ctrl+C
+def test_merge_wizard_cancelled(key):
+    assert run_wizard_with_keys(" ", key) is None